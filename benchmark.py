@@ -0,0 +1,238 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import timeit
+import tracemalloc
+
+import pygame
+
+from config import ConfigManager
+from core.assets import AssetManager
+from core.camera import Camera
+from core.compiler import compile_lines
+from core.generator import generate_rows
+from core.level import Level
+from core.lighting import Light, LightingSystem, create_light_mask
+from core.simulation import Simulation, init_headless
+from entities.player import Player
+from entities.swarm import Swarm
+
+SWARM_SIZES = [100, 1000, 5000]
+SYNTHETIC_SIZES = [(30, 19), (100, 100), (300, 300), (1000, 1000)]
+QUICK_SIZES = [(30, 19), (100, 100)]
+
+
+def surface_bytes(surfaces):
+    return sum(surface.get_width() * surface.get_height() * surface.get_bytesize()
+               for surface in surfaces if surface is not None)
+
+
+def lighting_bytes(lighting, visibility=None):
+    surfaces = [lighting.buffer, *lighting.mask_cache.masks.values()]
+    surfaces += [light.occluded_mask for light in lighting.lights]
+    if visibility is not None:
+        surfaces += visibility.surfaces.values()
+    return surface_bytes(surfaces)
+
+
+def measure(func, rounds=5):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(rounds, number)]
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'median_s': statistics.median(times),
+        'min_s': min(times),
+        'stdev_s': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'peak_bytes': peak,
+    }
+
+
+class BenchmarkSuite:
+    def __init__(self, config, rounds, name_filter=None):
+        self.config = config
+        self.rounds = rounds
+        self.name_filter = name_filter
+        self.assets = AssetManager(config)
+        self.screen = pygame.display.get_surface()
+        self.results = {}
+
+    def record(self, name, func, units=1, unit='op', surfaces=None):
+        if self.name_filter and self.name_filter not in name:
+            return
+        result = measure(func, self.rounds)
+        result['throughput'] = units / result['median_s']
+        result['unit'] = unit
+        line = (f"{name:<40} {result['median_s'] * 1e6:>12.1f} us  ±{result['stdev_s'] * 1e6:>9.1f}  "
+                f"{result['throughput']:>14,.0f} {unit}/s  py-heap peak {result['peak_bytes'] / 1024:>9.1f} KiB")
+        if surfaces is not None:
+            result['surface_bytes'] = surfaces()
+            line += f"  surfaces {result['surface_bytes'] / 1024:>9.1f} KiB"
+        self.results[name] = result
+        print(line)
+
+    def run_generator(self, width, height):
+        self.record(f"generate/maze{width}x{height}", lambda: generate_rows(width, height, 0),
+                    width * height, 'cell')
+
+    def run_level(self, label, lines):
+        data = compile_lines(lines)
+        cells = data.width * data.height
+        self.record(f"parse/{label}", lambda: compile_lines(lines), cells, 'cell')
+
+        self.record(f"level_build/{label}", lambda: Level(self.config, self.assets, 0, data), cells, 'cell')
+        level = Level(self.config, self.assets, 0, data)
+        self.record(f"level_draw/{label}", lambda: level.draw(self.screen), surfaces=lambda: level.chunk_bytes)
+        self.run_scrolling(label, level)
+        self.run_collisions(label, level)
+
+    def run_scrolling(self, label, level):
+        camera = Camera(self.config.screen_size)
+        camera.set_world(level.pixel_size)
+        world_width, world_height = level.pixel_size
+        step = self.config.cell_size * 4
+        position = [0]
+
+        def scroll():
+            position[0] = (position[0] + step) % max(world_width + world_height, 1)
+            camera.center_on(position[0] % max(world_width, 1), position[0] * 7 % max(world_height, 1))
+            level.draw(self.screen, camera)
+
+        self.record(f"level_scroll/{label}", scroll, surfaces=lambda: level.chunk_bytes)
+
+    def run_collisions(self, label, level):
+        player = Player(self.config, self.assets, *level.player_start)
+        rng = random.Random(0)
+        moves = [rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)]) for _ in range(1000)]
+
+        def walk():
+            for dx, dy in moves:
+                player.move(dx, dy, level)
+
+        self.record(f"player_move/{label}", walk, len(moves), 'move')
+
+    def run_lighting(self):
+        cell_size = self.config.cell_size
+        for radius in (int(cell_size * 1.5), int(cell_size * 3.5), cell_size * 8):
+            self.record(f"light_mask/r{radius}", lambda: create_light_mask(radius, 200))
+
+        width, height = self.config.screen_size
+        lighting = LightingSystem((width, height))
+        lights = [lighting.add_light(Light(int(cell_size * 1.5), 210)),
+                  lighting.add_light(Light(int(cell_size * 3.5), 180))]
+        positions = [(x * cell_size, (x * 7 % 19) * cell_size) for x in range(30)]
+        step = [0]
+
+        def composite():
+            step[0] += 1
+            for offset, light in enumerate(lights):
+                light.position = positions[(step[0] + offset * 5) % len(positions)]
+            lighting.update()
+            lighting.draw(self.screen)
+
+        self.record("lighting_composite/2 lights", composite, surfaces=lambda: lighting_bytes(lighting))
+
+        level = Level(self.config, self.assets, 0, compile_lines(generate_rows(width // cell_size,
+                                                                           height // cell_size, 0)))
+        lighting.set_view(level.visibility, (0, 0))
+        self.record("lighting_composite/2 lights occluded", composite,
+                    surfaces=lambda: lighting_bytes(lighting, level.visibility))
+
+        def cold():
+            level.visibility.cells.clear()
+            level.visibility.surfaces.clear()
+            composite()
+
+        self.record("lighting_composite/2 lights occluded cold", cold,
+                    surfaces=lambda: lighting_bytes(lighting, level.visibility))
+
+    def run_swarm(self, sizes):
+        level = Level(self.config, self.assets, 0, compile_lines(generate_rows(101, 101, 0)))
+        for count in sizes:
+            swarm = Swarm(self.config, self.assets, level, count, seed=0)
+            self.record(f"swarm_update/{count}", lambda: swarm.update(1 / 60), count, 'firefly')
+            self.record(f"swarm_draw/{count}", lambda: swarm.draw(self.screen), count, 'firefly')
+
+    def run_frames(self, levels, ticks=300):
+        simulation = Simulation(self.config, assets=self.assets)
+        game = simulation.game
+        for level_num in levels:
+            game.start_level(level_num)
+            game.draw()
+
+            def frames():
+                for _ in range(ticks):
+                    if game.current_state != game.GAME or game.current_level != level_num:
+                        game.start_level(level_num)
+                    game.update(simulation.dt)
+                    game.draw()
+
+            self.record(f"frame/level{level_num}", frames, ticks, 'frame',
+                        lambda: game.level.chunk_bytes + lighting_bytes(game.lighting, game.level.visibility))
+        game.loader.shutdown()
+        game.backgrounds.shutdown()
+
+
+def compare(results, baseline, threshold):
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    regressions = 0
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['min_s']
+        change = result['min_s'] / before - 1
+        flag = ''
+        if change > threshold:
+            flag = '  SLOWER'
+            regressions += 1
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"{name:<40} {before * 1e6:>10.1f}us {result['min_s'] * 1e6:>10.1f}us {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Firefly parsing, rendering and simulation headlessly.")
+    parser.add_argument("--config", default="config.ini")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per benchmark")
+    parser.add_argument("--quick", action="store_true", help="skip the largest synthetic mazes")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--save", metavar="FILE", help="write results to FILE as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change reported as a regression")
+    args = parser.parse_args()
+
+    init_headless()
+    config = ConfigManager(args.config)
+    pygame.display.set_mode(config.screen_size)
+    suite = BenchmarkSuite(config, args.rounds, args.filter)
+
+    for level_num in range(1, config.total_levels + 1):
+        with open(config.get_level_path(level_num)) as f:
+            suite.run_level(f"level{level_num}", f.read().splitlines())
+    for width, height in QUICK_SIZES if args.quick else SYNTHETIC_SIZES:
+        suite.run_generator(width, height)
+        suite.run_level(f"maze{width}x{height}", generate_rows(width, height, 0))
+    suite.run_lighting()
+    suite.run_swarm(SWARM_SIZES)
+    suite.run_frames(range(1, config.total_levels + 1))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(suite.results, f, indent=1)
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(suite.results, json.load(f), args.threshold)
+    pygame.quit()
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,52 +1,167 @@
-import os
+import ast
 import configparser
+import os
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from core.lighting import FALLOFF_CURVES
+
+ConfigSnapshot = namedtuple('ConfigSnapshot', [
+    'screen_size', 'cell_size', 'fps', 'idle_fps', 'frame_pacing', 'tick_rate', 'dirty_rect_threshold',
+    'chunk_size', 'chunk_cache_bytes', 'images_path', 'sounds_path', 'levels_path', 'cache_path', 'colors',
+    'move_cooldown', 'initial_level', 'total_levels', 'level_row_window', 'music_fade_ms',
+    'firefly_animation_delay', 'firefly_move_delay', 'light_falloff', 'final_image', 'swarm_size', 'swarm_speed',
+    'light_occlusion',
+])
+
+PACING_MODES = ('power', 'precise')
+
+
+def _color(parser, name):
+    value = ast.literal_eval(parser.get('Colors', name))
+    if not (isinstance(value, tuple) and len(value) in (3, 4)
+            and all(isinstance(channel, int) and 0 <= channel <= 255 for channel in value)):
+        raise ValueError(f"[Colors] {name} must be an (r, g, b) tuple, got {value!r}")
+    return value
+
+
+def _check(condition, message):
+    if not condition:
+        raise ValueError(message)
+
+
+def load_config(config_path):
+    parser = configparser.ConfigParser()
+    parser.read(config_path)
+
+    row_count = parser.getint('Game', 'level_row_count', fallback=0)
+    snapshot = ConfigSnapshot(
+        screen_size=(parser.getint('Graphics', 'screen_width'), parser.getint('Graphics', 'screen_height')),
+        cell_size=parser.getint('Graphics', 'cell_size'),
+        fps=parser.getint('Graphics', 'fps'),
+        idle_fps=parser.getint('Graphics', 'idle_fps', fallback=10),
+        frame_pacing=parser.get('Graphics', 'pacing', fallback='power'),
+        tick_rate=parser.getint('Game', 'tick_rate', fallback=60),
+        dirty_rect_threshold=parser.getfloat('Graphics', 'dirty_rect_threshold', fallback=0.5),
+        chunk_size=parser.getint('Graphics', 'chunk_size', fallback=16),
+        chunk_cache_bytes=parser.getint('Graphics', 'chunk_cache_mb', fallback=64) * 1024 * 1024,
+        images_path=parser.get('Paths', 'images'),
+        sounds_path=parser.get('Paths', 'sounds'),
+        levels_path=parser.get('Paths', 'levels'),
+        cache_path=parser.get('Paths', 'cache', fallback='.cache'),
+        colors=MappingProxyType({name: _color(parser, name) for name in ('background', 'wall', 'player')}),
+        move_cooldown=parser.getfloat('Game', 'move_cooldown'),
+        initial_level=parser.getint('Game', 'initial_level'),
+        total_levels=parser.getint('Game', 'total_levels'),
+        level_row_window=(parser.getint('Game', 'level_first_row', fallback=0), row_count) if row_count > 0 else None,
+        music_fade_ms=parser.getint('Sound', 'fade_ms', fallback=800),
+        firefly_animation_delay=parser.getfloat('Firefly', 'animation_delay'),
+        firefly_move_delay=parser.getfloat('Firefly', 'move_delay'),
+        light_falloff=parser.get('Lighting', 'falloff', fallback='linear'),
+        light_occlusion=parser.getboolean('Lighting', 'occlusion', fallback=True),
+        final_image=parser.get('Paths', 'final_image'),
+        swarm_size=parser.getint('Swarm', 'size', fallback=0),
+        swarm_speed=parser.getfloat('Swarm', 'speed', fallback=1.5),
+    )
+
+    width, height = snapshot.screen_size
+    _check(width > 0 and height > 0, "[Graphics] screen size must be positive")
+    _check(snapshot.cell_size > 0, "[Graphics] cell_size must be positive")
+    _check(snapshot.fps >= 0 and snapshot.idle_fps >= 0, "[Graphics] fps and idle_fps must not be negative")
+    _check(snapshot.frame_pacing in PACING_MODES, f"[Graphics] pacing must be one of {', '.join(PACING_MODES)}")
+    _check(snapshot.tick_rate > 0, "[Game] tick_rate must be positive")
+    _check(snapshot.chunk_size > 0, "[Graphics] chunk_size must be positive")
+    _check(0 <= snapshot.dirty_rect_threshold <= 1, "[Graphics] dirty_rect_threshold must be between 0 and 1")
+    _check(snapshot.chunk_cache_bytes >= 0, "[Graphics] chunk_cache_mb must not be negative")
+    _check(snapshot.light_falloff in FALLOFF_CURVES,
+           f"[Lighting] falloff must be one of {', '.join(FALLOFF_CURVES)}")
+    _check(snapshot.move_cooldown >= 0, "[Game] move_cooldown must not be negative")
+    _check(1 <= snapshot.initial_level <= snapshot.total_levels, "[Game] initial_level must be within total_levels")
+    _check(snapshot.firefly_animation_delay > 0 and snapshot.firefly_move_delay > 0,
+           "[Firefly] delays must be positive")
+    _check(snapshot.swarm_size >= 0 and snapshot.swarm_speed >= 0, "[Swarm] size and speed must not be negative")
+    return snapshot
 
 
 class ConfigManager:
     def __init__(self, config_path='config.ini'):
-        self.config = configparser.ConfigParser()
-        self.config.read(config_path)
+        self.config_path = config_path
+        self.snapshot = load_config(config_path)
+
+    def reload(self):
+        try:
+            snapshot = load_config(self.config_path)
+        except (configparser.Error, ValueError, SyntaxError) as e:
+            print(f"Error reloading config: {e}")
+            return False
+        changed = snapshot != self.snapshot
+        self.snapshot = snapshot
+        return changed
 
     @property
     def screen_size(self):
-        return (self.config.getint('Graphics', 'screen_width'),
-                self.config.getint('Graphics', 'screen_height'))
+        return self.snapshot.screen_size
 
     @property
     def cell_size(self):
-        return self.config.getint('Graphics', 'cell_size')
+        return self.snapshot.cell_size
 
     @property
     def fps(self):
-        return self.config.getint('Graphics', 'fps')
+        return self.snapshot.fps
+
+    @property
+    def idle_fps(self):
+        return self.snapshot.idle_fps
+
+    @property
+    def frame_pacing(self):
+        return self.snapshot.frame_pacing
+
+    @property
+    def tick_rate(self):
+        return self.snapshot.tick_rate
+
+    @property
+    def dirty_rect_threshold(self):
+        return self.snapshot.dirty_rect_threshold
+
+    @property
+    def chunk_size(self):
+        return self.snapshot.chunk_size
+
+    @property
+    def chunk_cache_bytes(self):
+        return self.snapshot.chunk_cache_bytes
 
     @property
     def images_path(self):
-        return self.config.get('Paths', 'images')
+        return self.snapshot.images_path
 
     @property
     def sounds_path(self):
-        return self.config.get('Paths', 'sounds')
+        return self.snapshot.sounds_path
 
     @property
     def colors(self):
-        return {
-            'background': eval(self.config.get('Colors', 'background')),
-            'wall': eval(self.config.get('Colors', 'wall')),
-            'player': eval(self.config.get('Colors', 'player'))
-        }
+        return self.snapshot.colors
 
     @property
     def move_cooldown(self):
-        return self.config.getfloat('Game', 'move_cooldown')
+        return self.snapshot.move_cooldown
 
     @property
     def initial_level(self):
-        return self.config.getint('Game', 'initial_level')
+        return self.snapshot.initial_level
 
     @property
     def total_levels(self):
-        return self.config.getint('Game', 'total_levels')
+        return self.snapshot.total_levels
+
+    @property
+    def level_row_window(self):
+        return self.snapshot.level_row_window
 
     def get_image_path(self, filename):
         return os.path.join(self.images_path, filename)
@@ -54,8 +169,11 @@ class ConfigManager:
     def get_sound_path(self, filename):
         return os.path.join(self.sounds_path, filename)
 
+    def get_cache_path(self, name):
+        return os.path.join(self.snapshot.cache_path, name)
+
     def get_level_path(self, level_num):
-        return os.path.join(self.config.get('Paths', 'levels'), f"level{level_num}.txt")
+        return os.path.join(self.snapshot.levels_path, f"level{level_num}.txt")
 
     def get_font_path(self, filename):
         font_dir = os.path.join(os.path.dirname(self.images_path), "fonts")
@@ -64,14 +182,63 @@ class ConfigManager:
             return font_path
         return os.path.join(self.images_path, filename)
 
+    @property
+    def music_fade_ms(self):
+        return self.snapshot.music_fade_ms
+
     @property
     def firefly_animation_delay(self):
-        return self.config.getfloat('Firefly', 'animation_delay')
+        return self.snapshot.firefly_animation_delay
 
     @property
     def firefly_move_delay(self):
-        return self.config.getfloat('Firefly', 'move_delay')
+        return self.snapshot.firefly_move_delay
+
+    @property
+    def light_falloff(self):
+        return self.snapshot.light_falloff
+
+    @property
+    def light_occlusion(self):
+        return self.snapshot.light_occlusion
+
+    @property
+    def final_image(self):
+        return self.snapshot.final_image
+
+    @property
+    def swarm_size(self):
+        return self.snapshot.swarm_size
+
+    @property
+    def swarm_speed(self):
+        return self.snapshot.swarm_speed
 
     @property
     def final_image_path(self):
-        return os.path.join(self.images_path, self.config.get('Paths', 'final_image'))
+        return os.path.join(self.images_path, self.final_image)
+
+
+class ConfigWatcher:
+    def __init__(self, config, interval=1.0):
+        self.config = config
+        self.interval = interval
+        self.next_check = time.monotonic() + interval
+        self.mtime = self._mtime()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.config.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self):
+        now = time.monotonic()
+        if now < self.next_check:
+            return False
+        self.next_check = now + self.interval
+        mtime = self._mtime()
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        return self.config.reload()
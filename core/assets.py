@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+
+import pygame
+
+
+class AssetManager:
+    RAW = None
+    OPAQUE = 'convert'
+    ALPHA = 'alpha'
+
+    def __init__(self, config, capacity=64, atlas_width=1024):
+        self.config = config
+        self.capacity = capacity
+        self.atlas_width = atlas_width
+        self.surfaces = OrderedDict()
+        self.atlases = {}
+        self.transforms = OrderedDict()
+        self.lock = threading.RLock()
+
+    def image(self, filename, mode=ALPHA):
+        key = (self.config.get_image_path(filename), mode)
+        with self.lock:
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.surfaces.move_to_end(key)
+                return surface
+
+            raw = self.surfaces.get((key[0], self.RAW))
+            if raw is None:
+                raw = pygame.image.load(key[0])
+            if mode == self.RAW:
+                surface = raw
+            elif mode == self.OPAQUE:
+                surface = raw.convert()
+            else:
+                surface = raw.convert_alpha()
+
+            self.surfaces[key] = surface
+            while len(self.surfaces) > self.capacity:
+                self.surfaces.popitem(last=False)
+            return surface
+
+    def atlas(self, filenames):
+        key = tuple(filenames)
+        with self.lock:
+            frames = self.atlases.get(key)
+            if frames is not None:
+                return frames
+
+            images = [self.image(filename, self.RAW) for filename in key]
+            positions = []
+            x = y = row_height = width = 0
+            for image in images:
+                w, h = image.get_size()
+                if x and x + w > self.atlas_width:
+                    x = 0
+                    y += row_height
+                    row_height = 0
+                positions.append((x, y))
+                x += w
+                row_height = max(row_height, h)
+                width = max(width, x)
+
+            sheet = pygame.Surface((width, y + row_height), pygame.SRCALPHA)
+            sheet.fill((0, 0, 0, 0))
+            for image, position in zip(images, positions):
+                sheet.blit(image, position, special_flags=pygame.BLEND_RGBA_MAX)
+            sheet = sheet.convert_alpha()
+
+            frames = [sheet.subsurface(pygame.Rect(position, image.get_size()))
+                      for image, position in zip(images, positions)]
+            self.atlases[key] = frames
+            return frames
+
+    def transformed(self, surface, size=None, flip_x=False):
+        if size is None and not flip_x:
+            return surface
+        key = (surface, size, flip_x)
+        with self.lock:
+            image = self.transforms.get(key)
+            if image is not None:
+                self.transforms.move_to_end(key)
+                return image
+
+            image = surface
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+            if flip_x:
+                image = pygame.transform.flip(image, True, False)
+
+            self.transforms[key] = image
+            while len(self.transforms) > self.capacity:
+                self.transforms.popitem(last=False)
+            return image
+
+    def clear(self):
+        with self.lock:
+            self.surfaces.clear()
+            self.atlases.clear()
+            self.transforms.clear()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from core.compiler import source_digest
+
+
+def prepare_background(image, size, dim=0):
+    width, height = size
+    img_width, img_height = image.get_size()
+    crop_width = min(img_width, width)
+    crop_height = min(img_height, height)
+    x_offset = max(0, (img_width - crop_width) // 2)
+    y_offset = max(0, (img_height - crop_height) // 2)
+
+    background = pygame.Surface(size)
+    background.fill((0, 0, 0))
+    cropped = image.subsurface((x_offset, y_offset,
+                                min(crop_width, img_width - x_offset),
+                                min(crop_height, img_height - y_offset)))
+    background.blit(cropped, ((width - cropped.get_width()) // 2, (height - cropped.get_height()) // 2))
+
+    if dim:
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, dim))
+        background.blit(overlay, (0, 0))
+    return background
+
+
+class BackgroundCache:
+    def __init__(self, config, size, cache_dir=None):
+        self.config = config
+        self.size = size
+        self.cache_dir = cache_dir
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background-loader")
+        self.pending = {}
+        self.ready = {}
+
+    def request(self, filename, dim=0):
+        key = (filename, dim)
+        if key not in self.ready and key not in self.pending:
+            self.pending[key] = self.executor.submit(self._load, filename, dim)
+
+    def get(self, filename, dim=0):
+        key = (filename, dim)
+        surface = self.ready.get(key)
+        if surface is not None:
+            return surface
+
+        future = self.pending.pop(key, None)
+        try:
+            surface = future.result() if future is not None else self._load(filename, dim)
+        except Exception as e:
+            print(f"Error loading background {filename}: {e}")
+            surface = pygame.Surface(self.size)
+            surface.fill((0, 0, 0))
+        self.ready[key] = surface
+        return surface
+
+    def _load(self, filename, dim):
+        path = self.config.get_image_path(filename)
+        width, height = self.size
+        cache_path = None
+        if self.cache_dir:
+            cache_path = os.path.join(self.cache_dir, f"{source_digest(path)}-{width}x{height}-{dim}.rgb")
+            try:
+                with open(cache_path, 'rb') as f:
+                    data = f.read()
+                if len(data) == width * height * 3:
+                    return pygame.image.frombytes(data, self.size, 'RGB').convert()
+            except OSError:
+                pass
+
+        surface = prepare_background(pygame.image.load(path), self.size, dim)
+        if cache_path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(pygame.image.tobytes(surface, 'RGB'))
+                os.replace(temp_path, cache_path)
+            except OSError as e:
+                print(f"Error caching background {filename}: {e}")
+        return surface
+
+    def shutdown(self):
+        self.pending.clear()
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,44 @@
+class Camera:
+    def __init__(self, view_size, dead_zone=0.25):
+        self.view_width, self.view_height = view_size
+        self.dead_zone = dead_zone
+        self.world_width = 0
+        self.world_height = 0
+        self.offset = (0, 0)
+
+    def set_world(self, size, focus=None):
+        self.world_width, self.world_height = size
+        self.offset = (0, 0)
+        if focus is not None:
+            self.center_on(*focus)
+
+    def center_on(self, x, y):
+        self.offset = (self._clamp(x - self.view_width // 2, self.world_width - self.view_width),
+                       self._clamp(y - self.view_height // 2, self.world_height - self.view_height))
+
+    def follow(self, x, y):
+        ox, oy = self.offset
+        margin_x = int(self.view_width * self.dead_zone)
+        margin_y = int(self.view_height * self.dead_zone)
+        if x - ox < margin_x:
+            ox = x - margin_x
+        elif x - ox > self.view_width - margin_x:
+            ox = x - self.view_width + margin_x
+        if y - oy < margin_y:
+            oy = y - margin_y
+        elif y - oy > self.view_height - margin_y:
+            oy = y - self.view_height + margin_y
+        self.offset = (self._clamp(ox, self.world_width - self.view_width),
+                       self._clamp(oy, self.world_height - self.view_height))
+
+    @staticmethod
+    def _clamp(value, limit):
+        if limit <= 0:
+            return 0
+        return max(0, min(value, limit))
+
+    def apply(self, rect):
+        return rect.move(-self.offset[0], -self.offset[1])
+
+    def to_screen(self, x, y):
+        return x - self.offset[0], y - self.offset[1]
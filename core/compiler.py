@@ -0,0 +1,176 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+FLOOR = 0
+WALL = 1
+
+MAGIC = b'FFLV'
+VERSION = 2
+HEADER = struct.Struct('<4sHxxIIIiiii')
+DIRECTIONS = {ord('r'): (1, 0), ord('l'): (-1, 0), ord('u'): (0, -1), ord('d'): (0, 1)}
+STRAIGHT = ord('_')
+OCCUPANCY = bytes(WALL if glyph == ord('#') else FLOOR for glyph in range(256))
+
+
+class CompiledLevel:
+    def __init__(self, width, height, grid, player_start, firefly_end, path, buffer=None):
+        self.width = width
+        self.height = height
+        self.grid = grid
+        self.player_start = player_start
+        self.firefly_end = firefly_end
+        self.path = path
+        self.buffer = buffer
+
+    def to_bytes(self):
+        start = self.player_start or (-1, -1)
+        end = self.firefly_end or (-1, -1)
+        header = HEADER.pack(MAGIC, VERSION, self.width, self.height, len(self.path), *start, *end)
+        padding = b'\0' * (-len(self.grid) % 4)
+        return header + bytes(self.grid) + padding + array('I', self.path).tobytes()
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        magic, version, width, height, path_length, sx, sy, ex, ey = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported compiled level format")
+        view = memoryview(buffer)
+        grid_end = HEADER.size + width * height
+        path_start = grid_end + (-grid_end % 4)
+        path_end = path_start + path_length * 4
+        if len(view) < path_end:
+            raise ValueError("Truncated compiled level")
+        return cls(width, height, view[HEADER.size:grid_end],
+                   (sx, sy) if sx >= 0 else None,
+                   (ex, ey) if ex >= 0 else None,
+                   view[path_start:path_end].cast('I'), buffer)
+
+
+def trace_path(glyphs, width, height, start, end):
+    x, y = start % width, start // width
+    for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < width and 0 <= ny < height and glyphs[ny * width + nx] in DIRECTIONS:
+            x, y = nx, ny
+            break
+    else:
+        return array('I')
+
+    path = array('I')
+    visited = set()
+    while True:
+        if not (0 <= x < width and 0 <= y < height):
+            break
+        index = y * width + x
+        if index == end:
+            path.append(index)
+            break
+        if index in visited:
+            break
+        visited.add(index)
+        path.append(index)
+        cell = glyphs[index]
+        if cell in DIRECTIONS:
+            dx, dy = DIRECTIONS[cell]
+        elif cell == STRAIGHT and len(path) >= 2:
+            dx = index % width - path[-2] % width
+            dy = index // width - path[-2] // width
+        else:
+            break
+        x += dx
+        y += dy
+    return path
+
+
+def read_glyphs(rows, first_row=0, row_count=None):
+    raw = bytearray()
+    lengths = array('I')
+    for row_index, row in enumerate(rows):
+        if row_index < first_row:
+            continue
+        if row_count is not None and row_index >= first_row + row_count:
+            break
+        if isinstance(row, str):
+            row = row.encode('ascii', 'replace')
+        row = row.rstrip(b'\r\n')
+        raw += row
+        lengths.append(len(row))
+
+    width = max(lengths, default=0)
+    height = len(lengths)
+    if len(raw) == width * height:
+        return raw, width, height
+
+    glyphs = bytearray(b'#') * (width * height)
+    offset = 0
+    for y, length in enumerate(lengths):
+        glyphs[y * width:y * width + length] = raw[offset:offset + length]
+        offset += length
+    return glyphs, width, height
+
+
+def compile_rows(rows, first_row=0, row_count=None):
+    glyphs, width, height = read_glyphs(rows, first_row, row_count)
+    start = glyphs.rfind(b'P')
+    end = glyphs.rfind(b'F')
+
+    path = array('I')
+    if start >= 0 and end >= 0:
+        path = trace_path(glyphs, width, height, start, end)
+    grid = glyphs.translate(OCCUPANCY)
+    return CompiledLevel(width, height, grid,
+                         (start % width, start // width) if start >= 0 else None,
+                         (end % width, end // width) if end >= 0 else None,
+                         path)
+
+
+def compile_lines(level_map):
+    return compile_rows(level_map)
+
+
+def compile_file(path, row_window=None):
+    first_row, row_count = row_window or (0, None)
+    with open(path, 'rb') as f:
+        return compile_rows(f, first_row, row_count)
+
+
+def _map_file(path):
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return CompiledLevel.from_buffer(buffer)
+
+
+def source_digest(path, row_window=None):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    if row_window:
+        digest.update(f"rows:{row_window[0]}:{row_window[1]}".encode())
+    return digest.hexdigest()
+
+
+def load_level(path, cache_dir=None, row_window=None):
+    if not cache_dir:
+        return compile_file(path, row_window)
+
+    cache_path = os.path.join(cache_dir, f"{source_digest(path, row_window)}.lvl")
+    try:
+        return _map_file(cache_path)
+    except (OSError, ValueError, struct.error):
+        pass
+
+    compiled = compile_file(path, row_window)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(compiled.to_bytes())
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"Error caching compiled level: {e}")
+    return compiled
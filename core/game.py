@@ -1,8 +1,19 @@
+import time
+
 import pygame
 
-from core.level import Level
-from entities.player import Player
-from entities.firefly import Firefly
+from core.assets import AssetManager
+from core.backgrounds import BackgroundCache
+from core.camera import Camera
+from core.input import STOP, KeyboardInput
+from core.lighting import Light, LightingSystem, MaskCache
+from core.loader import LevelLoader, prepare_level
+from core.music import MusicPlayer
+from core.pacing import FramePacer
+from core.profiler import FrameProfiler
+from core.renderer import DirtyRenderer
+from core.text import TextCache
+from entities.swarm import Swarm
 
 
 class Game:
@@ -10,15 +21,40 @@ class Game:
     GAME = 1
     SLIDESHOW = 3
     END = 2
-
-    def __init__(self, config):
+    MAX_FRAME_TIME = 0.25
+    BACKGROUND_DIM = 128
+    LEVEL_FIELDS = ('cell_size', 'chunk_size', 'chunk_cache_bytes', 'colors', 'images_path', 'levels_path',
+                    'cache_path', 'level_row_window', 'firefly_animation_delay', 'firefly_move_delay',
+                    'swarm_size', 'swarm_speed')
+    LIGHT_FIELDS = ('cell_size', 'light_falloff')
+
+    def __init__(self, config, assets=None, input_source=None):
         self.config = config
+        self.assets = assets or AssetManager(config)
+        self.input = input_source or KeyboardInput()
+        self.recorder = None
+        self.config_watcher = None
+        self.applied_config = config.snapshot
         self.width, self.height = config.screen_size
         self.screen = pygame.display.set_mode((self.width, self.height))
-        self.clock = pygame.time.Clock()
+        self.renderer = DirtyRenderer(self.screen, config.dirty_rect_threshold)
+        self.drawn_scene = None
+        self.text = TextCache()
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
+        self.profiler_overlay = None
+        self.profiler_overlay_time = 0.0
+        self.camera = Camera((self.width, self.height))
+        self.lighting = LightingSystem((self.width, self.height),
+                                       MaskCache(config.get_cache_path("masks"), config.cell_size))
+        self.pacer = FramePacer(config.fps, config.idle_fps, config.frame_pacing)
+        self.tick_time = 1.0 / config.tick_rate
+        self.lag = 0.0
+        self.last_direction = STOP
         self.current_state = self.MENU
         self.current_level = config.initial_level
         self.total_levels = config.total_levels
+        self.loader = LevelLoader(config, self.assets, self.total_levels)
 
         self.slideshow_slides = [
             {"speaker": "Firefly", "text": "*shining*", "color": (255, 255, 255)},
@@ -37,27 +73,16 @@ class Game:
 
         self._load_resources()
         self._init_game_objects()
-        self._init_light_masks()
+        self._init_lights()
 
     def _load_resources(self):
-        self.menu_music = pygame.mixer.Sound(self.config.get_sound_path("menu.ogg"))
-        self.game_music = pygame.mixer.Sound(self.config.get_sound_path("game.ogg"))
-
-        try:
-            self.menu_background_img = pygame.image.load(self.config.get_image_path("menu.png")).convert()
-            self.menu_background = self._prepare_background_image(self.menu_background_img)
-        except Exception as e:
-            print(f"Error loading menu background: {e}")
-            self.menu_background = pygame.Surface((self.width, self.height))
-            self.menu_background.fill((0, 0, 0))
+        self.music = MusicPlayer(self.config, self.config.music_fade_ms)
 
-        try:
-            self.end_background_img = pygame.image.load(self.config.get_image_path("end.png")).convert()
-            self.end_background = self._prepare_background_image(self.end_background_img)
-        except Exception as e:
-            print(f"Error loading end background: {e}")
-            self.end_background = pygame.Surface((self.width, self.height))
-            self.end_background.fill((0, 0, 0))
+        self.backgrounds = BackgroundCache(self.config, (self.width, self.height),
+                                           self.config.get_cache_path("backgrounds"))
+        self.menu_background = self.backgrounds.get("menu.png", self.BACKGROUND_DIM)
+        self.backgrounds.request(self.config.final_image)
+        self.backgrounds.request("end.png", self.BACKGROUND_DIM)
 
         try:
             self.title_font = pygame.font.Font(self.config.get_font_path("ZenMasters.ttf"), 74)
@@ -67,98 +92,99 @@ class Game:
             self.title_font = pygame.font.SysFont("arial", 74)
             self.text_font = pygame.font.SysFont("arial", 36)
             self.control_font = pygame.font.SysFont("arial", 24)
-
-    def _prepare_background_image(self, image):
-        img_width, img_height = image.get_size()
-        crop_width = min(img_width, self.width)
-        crop_height = min(img_height, self.height)
-        x_offset = max(0, (img_width - crop_width) // 2)
-        y_offset = max(0, (img_height - crop_height) // 2)
-
-        background = pygame.Surface((self.width, self.height))
-        background.fill((0, 0, 0))  
-
-        try:
-            cropped = image.subsurface((x_offset, y_offset,
-                                        min(crop_width, img_width - x_offset),
-                                        min(crop_height, img_height - y_offset)))
-
-            x_pos = (self.width - cropped.get_width()) // 2
-            y_pos = (self.height - cropped.get_height()) // 2
-            background.blit(cropped, (x_pos, y_pos))
-
-            overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))
-
-            background.blit(overlay, (0, 0))
-
-            return background
-
-        except Exception as e:
-            print(f"Error cropping background image: {e}")
-            background.fill((0, 0, 0))
-            return background
+        self.overlay_font = pygame.font.Font(None, 20)
 
     def _init_game_objects(self):
         self.level = None
         self.player = None
         self.firefly = None
+        self.swarm = None
+        self.loader.prefetch(self.current_level)
 
     def _init_level(self):
-        self.level = Level(self.config, self.current_level)
-        self.player = Player(self.config, *self.level.player_start)
-        self.firefly = Firefly(self.config, self.level.firefly_path)
+        self.level, self.player, self.firefly = self.loader.get(self.current_level)
+        self.swarm = Swarm(self.config, self.assets, self.level, self.config.swarm_size, seed=self.current_level)
+        self.camera.set_world(self.level.pixel_size, self.player.rect.center)
         self.current_state = self.GAME
+        if self.recorder is not None:
+            self.recorder.start(self.current_level)
+        self.loader.prefetch(self.current_level + 1)
+
+    def start_level(self, level_num):
+        self.current_level = level_num
+        self._init_level()
+
+    def snapshot(self):
+        return (self.current_state, self.current_level, self.current_slide, self.level,
+                self.player, self.player.snapshot(), self.firefly, self.firefly.snapshot(),
+                self.swarm, self.swarm.snapshot())
+
+    def restore(self, state):
+        (self.current_state, self.current_level, self.current_slide, self.level,
+         self.player, player_state, self.firefly, firefly_state, self.swarm, swarm_state) = state
+        self.player.restore(player_state)
+        self.firefly.restore(firefly_state)
+        self.swarm.restore(swarm_state)
+        self.camera.set_world(self.level.pixel_size, self.player.rect.center)
 
     def _init_slideshow(self):
-        try:
-            final_img = pygame.image.load(self.config.final_image_path).convert()
-            img_width, img_height = final_img.get_size()
-            crop_width = min(img_width, self.width)
-            crop_height = min(img_height, self.height)
-            x_offset = max(0, (img_width - crop_width) // 2)
-            y_offset = max(0, (img_height - crop_height) // 2)
-            self.slide_background = pygame.Surface((self.width, self.height))
-            cropped = final_img.subsurface((x_offset, y_offset, min(crop_width, img_width - x_offset),
-                                            min(crop_height, img_height - y_offset)))
-            self.slide_background.fill((0, 0, 0))
-            x_pos = (self.width - cropped.get_width()) // 2
-            y_pos = (self.height - cropped.get_height()) // 2
-            self.slide_background.blit(cropped, (x_pos, y_pos))
-        except Exception as e:
-            print(f"Error loading final image: {e}")
-            self.slide_background = pygame.Surface((self.width, self.height))
-            self.slide_background.fill((0, 0, 0))
-
-        self.continue_prompt = self.control_font.render("Press 'Enter' to continue", True, (180, 180, 180))
+        self.slide_background = self.backgrounds.get(self.config.final_image)
+        self.continue_prompt = self.text.render(self.control_font, "Press 'Enter' to continue", (180, 180, 180))
         self.current_slide = 0
         self.current_state = self.SLIDESHOW
 
-    def _init_light_masks(self):
+    def _config_changed(self, previous, fields):
+        return any(getattr(previous, field) != getattr(self.applied_config, field) for field in fields)
+
+    def _apply_config(self):
+        config = self.config
+        previous, self.applied_config = self.applied_config, config.snapshot
+        if config.screen_size != previous.screen_size:
+            print("Screen size changes take effect after a restart")
+        self.pacer.fps, self.pacer.idle_fps, self.pacer.mode = config.fps, config.idle_fps, config.frame_pacing
+        self.tick_time = 1.0 / config.tick_rate
+        self.music.fade_ms = config.music_fade_ms
+        self.renderer.set_full_update_ratio(config.dirty_rect_threshold)
+        if self._config_changed(previous, self.LIGHT_FIELDS):
+            self.lighting.mask_cache.cell_size = config.cell_size
+            self.lighting.clear()
+            self._init_lights()
+
+        if self._config_changed(previous, self.LEVEL_FIELDS):
+            self.loader.discard()
+            if self.level is not None:
+                player_state, firefly_state = self.player.snapshot(), self.firefly.snapshot()
+                progress = self.firefly.elapsed / self.firefly.move_delay
+                self.level, self.player, self.firefly = prepare_level(config, self.assets, self.current_level)
+                self.swarm = Swarm(config, self.assets, self.level, config.swarm_size, seed=self.current_level)
+                self.player.restore(player_state)
+                self.firefly.restore(firefly_state)
+                self.firefly.elapsed = progress * self.firefly.move_delay
+                self.camera.set_world(self.level.pixel_size, self.player.rect.center)
+            if self.current_state == self.GAME:
+                self.loader.prefetch(self.current_level + 1)
+            else:
+                self.loader.prefetch(self.current_level)
+        self.renderer.invalidate()
+
+    def _init_lights(self):
         cell_size = self.config.cell_size
-        self.player_light_mask = self._create_light_mask(int(cell_size * 1.5), alpha=210)
-        self.firefly_light_mask = self._create_light_mask(int(cell_size * 3.5), alpha=180)
-
-    def _create_light_mask(self, radius, alpha=220):
-        size = radius * 2
-        mask = pygame.Surface((size, size), pygame.SRCALPHA)
-        center = (size // 2, size // 2)
-        for r in range(radius, 0, -1):
-            step_alpha = int(alpha * (1 - r / radius))
-            pygame.draw.circle(mask, (0, 0, 0, step_alpha), center, r)
-        return mask
+        curve = self.config.light_falloff
+        self.player_light = self.lighting.add_light(Light(int(cell_size * 1.5), 210, curve=curve))
+        self.firefly_light = self.lighting.add_light(Light(int(cell_size * 3.5), 180, curve=curve))
 
     def _handle_menu_events(self, event):
         if event.key == pygame.K_RETURN:
-            self.menu_music.stop()
-            self.game_music.play(-1)
+            self.music.play("game.ogg")
             self._init_level()
 
     def _handle_game_events(self, event):
         if event.key == pygame.K_ESCAPE:
-            self.game_music.stop()
-            self.menu_music.play(-1)
+            if self.recorder is not None:
+                self.recorder.stop()
+            self.music.play("menu.ogg")
             self.current_state = self.MENU
+            self.loader.prefetch(self.current_level)
 
     def _handle_slideshow_events(self, event):
         if event.key == pygame.K_RETURN:
@@ -167,23 +193,33 @@ class Game:
                 self.current_state = self.END
 
     def _check_level_completion(self):
-        if self.firefly.path and (self.player.grid_x, self.player.grid_y) == self.firefly.path[-1]:
+        if self.firefly.route and (self.player.grid_x, self.player.grid_y) == self.firefly.route[-1]:
             if self.current_level < self.total_levels:
                 self.current_level += 1
                 self._init_level()
             else:
-                self.game_music.stop()
-                self._init_slideshow()
+                self.music.stop()
                 self._init_slideshow()
 
-    def handle_events(self):
-        for event in pygame.event.get():
+    def is_idle(self):
+        if self.music.fading:
+            return False
+        if self.current_state == self.GAME:
+            return (self.last_direction == STOP and self.firefly.waiting_for_player
+                    and not self.player.gliding and not self.swarm.count)
+        return True
+
+    def handle_events(self, events=None):
+        for event in pygame.event.get() if events is None else events:
             if event.type == pygame.QUIT:
                 return False
 
 
             if event.type == pygame.KEYDOWN:
-                if self.current_state == self.MENU:
+                if event.key == pygame.K_F3:
+                    self.show_profiler = not self.show_profiler
+                    self.renderer.invalidate()
+                elif self.current_state == self.MENU:
                     self._handle_menu_events(event)
                 elif self.current_state == self.GAME:
                     self._handle_game_events(event)
@@ -195,8 +231,16 @@ class Game:
 
     def update(self, dt):
         if self.current_state == self.GAME:
-            self.firefly.update(dt, wait_for_player=(self.player.grid_x, self.player.grid_y))
-            self.player.update(dt, self.level.get_walls())
+            direction = self.input.direction()
+            self.last_direction = direction
+            if self.recorder is not None:
+                self.recorder.record(dt, direction)
+            with self.profiler.section('firefly'):
+                self.firefly.update(dt, wait_for_player=(self.player.grid_x, self.player.grid_y))
+            with self.profiler.section('player'):
+                self.player.update(dt, self.level, direction)
+            with self.profiler.section('swarm'):
+                self.swarm.update(dt)
             self._check_level_completion()
         elif self.current_state == self.SLIDESHOW:
             self.player.animation_timer += dt
@@ -214,79 +258,124 @@ class Game:
         self.screen.blit(self.slide_background, (0, 0))
 
         strip_height = 150
-        strip_top = self.height - strip_height - 50
+        strip_top = self._slideshow_strip_top()
         strip = pygame.Surface((self.width, strip_height), pygame.SRCALPHA)
         strip.fill((0, 0, 0, 180))
         self.screen.blit(strip, (0, strip_top))
 
         slide_data = self.slideshow_slides[self.current_slide]
-        speaker_text = self.control_font.render(slide_data["speaker"] + ":", True, (255, 255, 255))
+        speaker_text = self.text.render(self.control_font, slide_data["speaker"] + ":", (255, 255, 255))
         speaker_rect = speaker_text.get_rect(topleft=(50, strip_top + 20))
         self.screen.blit(speaker_text, speaker_rect)
 
-        text = slide_data["text"]
         color = slide_data["color"]
         text_height = 70
-        words = text.split()
-        line = ""
-
-        for word in words:
-            test_line = line + word + " "
-            test_width = self.control_font.size(test_line)[0]
-            if test_width > self.width - 100:
-                line_surf = self.control_font.render(line, True, color)
-                self.screen.blit(line_surf, (50, strip_top + text_height))
-                text_height += line_surf.get_height() + 10
-                line = word + " "
-            else:
-                line = test_line
-
-        if line:
-            line_surf = self.control_font.render(line, True, color)
+        for line in self.text.wrap(self.control_font, slide_data["text"], self.width - 100):
+            line_surf = self.text.render(self.control_font, line, color)
             self.screen.blit(line_surf, (50, strip_top + text_height))
+            text_height += line_surf.get_height() + 10
 
         prompt_rect = self.continue_prompt.get_rect(bottomright=(self.width - 20, self.height - 20))
         self.screen.blit(self.continue_prompt, prompt_rect)
 
+        portrait = self._slideshow_portrait(strip_top)
+        if portrait:
+            img, img_rect = portrait
+            self.screen.blit(img, img_rect)
+
+    def _slideshow_portrait(self, strip_top):
+        slide_data = self.slideshow_slides[self.current_slide]
         if slide_data["speaker"] == "Player":
-            img = pygame.transform.scale(
-                self.player.images[self.player.frame],
-                (self.config.cell_size * 8, self.config.cell_size * 8)
-            )
+            img = self.player.sprite((self.config.cell_size * 8, self.config.cell_size * 8))
             img_rect = img.get_rect(center=(self.width // 4, strip_top - 100))
-            if self.player.last_direction[0] < 0:
-                img = pygame.transform.flip(img, True, False)
-            self.screen.blit(img, img_rect)
+            return img, img_rect
         elif slide_data["speaker"] == "Firefly":
-            img = pygame.transform.scale(
-                self.firefly.images[self.firefly.frame],
-                (self.config.cell_size * 3, self.config.cell_size * 3)
-            )
+            img = self.firefly.sprite((self.config.cell_size * 3, self.config.cell_size * 3))
             img_rect = img.get_rect(center=(self.width // 4, strip_top - 50))
-            self.screen.blit(img, img_rect)
+            return img, img_rect
+        return None
 
-    def draw(self):
-        self.screen.fill(self.config.colors['background'])
+    def _track_slideshow(self):
+        portrait = self._slideshow_portrait(self._slideshow_strip_top())
+        if portrait:
+            self.renderer.track(portrait[1])
 
-        if self.current_state == self.MENU:
-            self._draw_menu()
-        elif self.current_state == self.GAME:
-            self._draw_game(show_player=True)
-        elif self.current_state == self.SLIDESHOW:
-            self._draw_slideshow()
-        elif self.current_state == self.END:
-            self._draw_end()
+    def _slideshow_strip_top(self):
+        return self.height - 150 - 50
+
+    def draw(self, lag=0.0):
+        self.lag = lag
+        if self.current_state == self.GAME:
+            self.camera.follow(*self.player.render_rect(lag).center)
 
-        pygame.display.flip()
+        scene = (self.current_state, self.level, self.current_slide, self.camera.offset)
+        if scene != self.drawn_scene:
+            self.drawn_scene = scene
+            self.renderer.invalidate()
+
+        if self.current_state == self.GAME:
+            self._track_game()
+        elif self.current_state == self.SLIDESHOW:
+            self._track_slideshow()
+        if self.show_profiler:
+            self._update_profiler_overlay()
+            self.renderer.track(self.profiler_overlay.get_rect(topleft=(8, 8)))
+
+        background = self.config.colors['background']
+        for rect in self.renderer.regions():
+            self.screen.set_clip(rect)
+            self.screen.fill(background, rect)
+
+            if self.current_state == self.MENU:
+                self._draw_menu()
+            elif self.current_state == self.GAME:
+                self._draw_game(show_player=True)
+            elif self.current_state == self.SLIDESHOW:
+                self._draw_slideshow()
+            elif self.current_state == self.END:
+                self._draw_end()
+
+            if self.show_profiler:
+                self.screen.blit(self.profiler_overlay, (8, 8))
+        self.screen.set_clip(None)
+
+        with self.profiler.section('present'):
+            self.renderer.present()
+
+    def _update_profiler_overlay(self):
+        now = time.perf_counter()
+        if self.profiler_overlay is not None and now - self.profiler_overlay_time < 0.25:
+            return
+        self.profiler_overlay_time = now
+
+        stats = self.profiler.stats()
+        lines = [
+            f"FPS {stats['fps']:.0f}   frame p50 {stats['p50_ms']:.2f} ms   p99 {stats['p99_ms']:.2f} ms",
+            f"blits/frame {stats['blits']:.1f}   alloc blocks/frame {stats['alloc_blocks']:+.1f}",
+        ]
+        lines += [f"{name:<10} {stats[f'{name}_ms']:.3f} ms" for name in self.profiler.section_names]
+        surfaces = [self.overlay_font.render(line, True, (230, 230, 230)) for line in lines]
+
+        width = max(surf.get_width() for surf in surfaces) + 12
+        height = sum(surf.get_height() for surf in surfaces) + 12
+        overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 190))
+        y = 6
+        for surf in surfaces:
+            overlay.blit(surf, (6, y))
+            y += surf.get_height()
+        if self.profiler_overlay is not None and self.profiler_overlay.get_size() != overlay.get_size():
+            self.renderer.add(self.profiler_overlay.get_rect(topleft=(8, 8)))
+        self.profiler_overlay = overlay
 
     def _draw_menu(self):
         self.screen.blit(self.menu_background, (0, 0))
 
-        title = self.title_font.render("Firefly", True, (255, 255, 0))
+        title = self.text.render(self.title_font, "Firefly", (255, 255, 0))
         title_rect = title.get_rect(center=(self.width // 2, self.height // 3))
         self.screen.blit(title, title_rect)
 
-        prompt = self.text_font.render("Press ENTER to start", True, (200, 200, 200))
+        prompt = self.text.render(self.text_font, "Press ENTER to start", (200, 200, 200))
         prompt_rect = prompt.get_rect(center=(self.width // 2, self.height * 2 // 3))
         self.screen.blit(prompt, prompt_rect)
 
@@ -298,52 +387,80 @@ class Game:
 
         y = self.height - 80
         for line in controls:
-            surf = self.control_font.render(line, True, (180, 180, 180))
+            surf = self.text.render(self.control_font, line, (180, 180, 180))
             rect = surf.get_rect(center=(self.width // 2, y))
             self.screen.blit(surf, rect)
             y += 28
 
-    def _draw_game(self, show_player=True):
-        self.level.draw(self.screen)
-
-        if show_player:
-            self.player.draw(self.screen)
-            self.firefly.draw(self.screen)
-
-        darkness = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        darkness.fill((0, 0, 0, 250))
-
+    def _light_centers(self):
         cell_size = self.config.cell_size
-        px = self.player.grid_x * cell_size + cell_size // 2
-        py = self.player.grid_y * cell_size + cell_size // 2
+        px, py = self.player.render_pos(self.lag)
+        px += cell_size // 2
+        py += cell_size // 2
 
-        fx, fy = self.firefly.pos
+        fx, fy = self.firefly.render_pos(self.lag)
         fx += cell_size // 2
         fy += cell_size // 2
+        return self.camera.to_screen(px, py), self.camera.to_screen(fx, fy)
+
+    def _track_game(self):
+        self.player_light.position, self.firefly_light.position = self._light_centers()
+        self.lighting.set_view(self.level.visibility if self.config.light_occlusion else None, self.camera.offset)
+        with self.profiler.section('lighting'):
+            self.lighting.update()
+        self.profiler.count('blits', self.lighting.blits)
+
+        self.renderer.track(self.camera.apply(self.player.render_rect(self.lag)))
+        self.renderer.track(self.camera.apply(self.firefly.render_rect(self.lag)))
+        for light in self.lighting.lights:
+            self.renderer.track(light.drawn_rect)
+        if self.swarm.count:
+            self.renderer.track(self.swarm.bounds(self.camera.offset))
 
-        darkness.blit(self.player_light_mask, self.player_light_mask.get_rect(center=(px, py)),
-                      special_flags=pygame.BLEND_RGBA_SUB)
+    def _draw_game(self, show_player=True):
+        with self.profiler.section('level'):
+            blits = self.level.draw(self.screen, self.camera)
 
-        darkness.blit(self.firefly_light_mask, self.firefly_light_mask.get_rect(center=(fx, fy)),
-                      special_flags=pygame.BLEND_RGBA_SUB)
+        if show_player:
+            blits += self.player.draw(self.screen, self.camera.offset, self.lag)
+            blits += self.firefly.draw(self.screen, self.camera.offset, self.lag)
 
-        self.screen.blit(darkness, (0, 0))
+        with self.profiler.section('lighting'):
+            blits += self.lighting.draw(self.screen)
+        with self.profiler.section('swarm'):
+            blits += self.swarm.draw(self.screen, self.camera.offset)
+        self.profiler.count('blits', blits)
 
     def _draw_end(self):
-        self.screen.blit(self.end_background, (0, 0))
+        self.screen.blit(self.backgrounds.get("end.png", self.BACKGROUND_DIM), (0, 0))
 
-        text = self.title_font.render("The End", True, (255, 255, 255))
+        text = self.text.render(self.title_font, "The End", (255, 255, 255))
         text_rect = text.get_rect(center=(self.width // 2, self.height // 4))
         self.screen.blit(text, text_rect)
 
     def run(self):
-        self.menu_music.play(-1)
+        self.music.play("menu.ogg")
         running = True
+        lag = 0.0
 
         while running:
-            dt = self.clock.tick(self.config.fps) / 1000.0
-            running = self.handle_events()
-            self.update(dt)
-            self.draw()
-
+            dt, events, idle = self.pacer.next_frame(self.is_idle())
+            if idle:
+                lag = 0.0
+            else:
+                lag += min(dt, self.MAX_FRAME_TIME)
+            self.profiler.begin_frame()
+            with self.profiler.section('events'):
+                running = self.handle_events(events)
+            self.music.update()
+            if self.config_watcher is not None and self.config_watcher.poll():
+                self._apply_config()
+            while lag >= self.tick_time:
+                self.update(self.tick_time)
+                lag -= self.tick_time
+            self.draw(lag)
+            self.profiler.end_frame()
+
+        self.loader.shutdown()
+        self.backgrounds.shutdown()
         pygame.quit()
@@ -0,0 +1,79 @@
+import random
+from array import array
+
+from core.compiler import OCCUPANCY, CompiledLevel
+
+WALL_GLYPH = ord('#')
+FLOOR_GLYPH = ord('_')
+MIN_SIZE = 5
+
+
+def carve(width, height, rng):
+    glyphs = bytearray(b'#') * (width * height)
+    parent = array('i', [-1]) * (width * height)
+    start = width + 1
+    glyphs[start] = FLOOR_GLYPH
+    stack = [start]
+    deepest, depth = start, 1
+    while stack:
+        index = stack[-1]
+        x, y = index % width, index // width
+        options = []
+        if x + 2 < width - 1 and glyphs[index + 2] == WALL_GLYPH:
+            options.append(2)
+        if x > 1 and glyphs[index - 2] == WALL_GLYPH:
+            options.append(-2)
+        if y + 2 < height - 1 and glyphs[index + 2 * width] == WALL_GLYPH:
+            options.append(2 * width)
+        if y > 1 and glyphs[index - 2 * width] == WALL_GLYPH:
+            options.append(-2 * width)
+        if not options:
+            stack.pop()
+            continue
+        step = options[rng.randrange(len(options))]
+        cell = index + step
+        glyphs[index + step // 2] = glyphs[cell] = FLOOR_GLYPH
+        parent[cell] = index
+        stack.append(cell)
+        if len(stack) > depth:
+            deepest, depth = cell, len(stack)
+    return glyphs, parent, start, deepest
+
+
+def generate_glyphs(width, height, seed=None):
+    if width < MIN_SIZE or height < MIN_SIZE:
+        raise ValueError(f"Maze must be at least {MIN_SIZE}x{MIN_SIZE}")
+    glyphs, parent, start, end = carve(width, height, random.Random(seed))
+
+    route = [end]
+    while route[-1] != start:
+        cell = route[-1]
+        route.append((cell + parent[cell]) // 2)
+        route.append(parent[cell])
+    route.reverse()
+
+    glyph_for = {1: ord('r'), -1: ord('l'), width: ord('d'), -width: ord('u')}
+    for index, following in zip(route[1:-1], route[2:]):
+        glyphs[index] = glyph_for[following - index]
+    glyphs[start] = ord('P')
+    glyphs[end] = ord('F')
+    return glyphs, array('I', route[1:])
+
+
+def generate_level(width, height, seed=None):
+    glyphs, path = generate_glyphs(width, height, seed)
+    return CompiledLevel(width, height, glyphs.translate(OCCUPANCY),
+                         (1, 1), (path[-1] % width, path[-1] // width), path)
+
+
+def generate_rows(width, height, seed=None):
+    glyphs, _ = generate_glyphs(width, height, seed)
+    return [glyphs[y * width:(y + 1) * width].decode('ascii') for y in range(height)]
+
+
+def write_level(path, width, height, seed=None):
+    glyphs, _ = generate_glyphs(width, height, seed)
+    with open(path, 'wb') as f:
+        for y in range(height):
+            f.write(glyphs[y * width:(y + 1) * width])
+            f.write(b'\n')
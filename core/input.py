@@ -0,0 +1,47 @@
+import pygame
+
+STOP = (0, 0)
+DIRECTION_KEYS = {'w': (0, -1), 's': (0, 1), 'a': (-1, 0), 'd': (1, 0), '.': STOP}
+
+
+class KeyboardInput:
+    def direction(self):
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_w]:
+            return 0, -1
+        elif keys[pygame.K_s]:
+            return 0, 1
+        elif keys[pygame.K_a]:
+            return -1, 0
+        elif keys[pygame.K_d]:
+            return 1, 0
+        return STOP
+
+
+class ScriptedInput:
+    def __init__(self, directions):
+        self.directions = list(directions)
+        self.tick = 0
+
+    @classmethod
+    def from_string(cls, script):
+        directions = []
+        for line_num, line in enumerate(script.splitlines(), 1):
+            for column, key in enumerate(line, 1):
+                if key.isspace():
+                    continue
+                if key not in DIRECTION_KEYS:
+                    raise ValueError(f"Unknown input {key!r} at line {line_num}, column {column}")
+                directions.append(DIRECTION_KEYS[key])
+        return cls(directions)
+
+    @property
+    def finished(self):
+        return self.tick >= len(self.directions)
+
+    def direction(self):
+        if self.finished:
+            return STOP
+        direction = self.directions[self.tick]
+        self.tick += 1
+        return direction
@@ -1,96 +1,145 @@
+from array import array
+from collections import OrderedDict
+
 import pygame
-import os
+
+from core.compiler import FLOOR, WALL, compile_lines, load_level
+from core.visibility import VisibilityMap
+
 
 class Level:
-    def __init__(self, config, level_num):
+    FLOOR = FLOOR
+    WALL = WALL
+
+    def __init__(self, config, assets, level_num, data=None):
         self.config = config
         self.cell_size = config.cell_size
         self.level_num = level_num
-        self.level_map = []
-        self.walls = []
-        self.floors = []
+        self.data = None
         self.player_start = (1, 1)
-        self.firefly_path = []
-        self.firefly_end = None
-        self.wall_image = pygame.image.load(config.get_image_path("wall.png")).convert_alpha()
-        self.floor_image = pygame.image.load(config.get_image_path("floor.png")).convert_alpha()
-        self._load_level()
-        self._parse_level()
-
-    def _load_level(self):
-        level_path = self.config.get_level_path(self.level_num)
-        with open(level_path, 'r') as f:
-            self.level_map = [line.rstrip('\n') for line in f]
-
-    def _parse_level(self):
-        self.walls = []
-        self.floors = []
-        self.player_start = None
-        self.firefly_path = []
+        self.firefly_route = array('I')
         self.firefly_end = None
+        self.width = 0
+        self.height = 0
+        self.grid = bytearray()
+        self.visibility = None
+        self.chunks = OrderedDict()
+        self.chunk_bytes = 0
+        self.chunk_budget = config.chunk_cache_bytes
+        self.chunk_cols = self.chunk_rows = config.chunk_size
+        self.wall_image = assets.image("wall.png")
+        self.floor_image = assets.image("floor.png")
+        if data is None:
+            data = load_level(config.get_level_path(level_num), config.get_cache_path("levels"),
+                              config.level_row_window)
+        self._apply_data(data)
+
+    def set_map(self, level_map):
+        self._apply_data(compile_lines(level_map))
+
+    def _apply_data(self, data):
+        self.data = data
+        self.width = data.width
+        self.height = data.height
+        self.grid = data.grid
+        self.visibility = VisibilityMap(self.grid, self.width, self.height, self.cell_size)
+        self.player_start = data.player_start
+        if self.player_start is None:
+            floor = bytes(self.grid).find(bytes([self.FLOOR]))
+            self.player_start = (floor % self.width, floor // self.width) if floor >= 0 else (0, 0)
+            print(f"Level {self.level_num}: no player start 'P' in the loaded rows, "
+                  f"starting at {self.player_start}")
+        self.firefly_end = data.firefly_end
+        self.firefly_route = data.path
+        end = self.firefly_end
+        if data.player_start and end and (not data.path or data.path[-1] != end[1] * self.width + end[0]):
+            print(f"Level {self.level_num}: firefly route from 'P' does not reach 'F'")
+        self._init_chunks()
+
+    def is_blocked(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.grid[y * self.width + x] == self.WALL
+        return True
+
+    @property
+    def pixel_size(self):
+        return self.width * self.cell_size, self.height * self.cell_size
+
+    def _init_chunks(self):
+        self.chunks.clear()
+        self.chunk_bytes = 0
+        view_width, view_height = self.config.screen_size
+        pixel_width, pixel_height = self.pixel_size
+        if pixel_width <= view_width and pixel_height <= view_height:
+            self.chunk_cols, self.chunk_rows = max(self.width, 1), max(self.height, 1)
+        else:
+            self.chunk_cols = self.chunk_rows = self.config.chunk_size
+
+    def _render_chunk(self, cx, cy):
+        x0 = cx * self.chunk_cols
+        y0 = cy * self.chunk_rows
+        cols = min(self.chunk_cols, self.width - x0)
+        rows = min(self.chunk_rows, self.height - y0)
+        surface = pygame.Surface((cols * self.cell_size, rows * self.cell_size)).convert()
+        surface.fill(self.config.colors['background'])
+        tiles = (self.floor_image, self.wall_image)
+        grid = self.grid
+        blits = []
+        for y in range(rows):
+            row = (y0 + y) * self.width + x0
+            for x in range(cols):
+                blits.append((tiles[grid[row + x]], (x * self.cell_size, y * self.cell_size)))
+        surface.blits(blits, doreturn=False)
+        return surface
+
+    def _chunk(self, cx, cy):
+        key = (cx, cy)
+        surface = self.chunks.get(key)
+        if surface is not None:
+            self.chunks.move_to_end(key)
+            return surface
+        surface = self._render_chunk(cx, cy)
+        self.chunks[key] = surface
+        self.chunk_bytes += surface.get_width() * surface.get_height() * surface.get_bytesize()
+        return surface
+
+    def _evict_chunks(self, keep):
+        for key in list(self.chunks):
+            if self.chunk_bytes <= self.chunk_budget:
+                break
+            if key in keep:
+                continue
+            surface = self.chunks.pop(key)
+            self.chunk_bytes -= surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def visible_chunks(self, rect):
+        chunk_width = self.chunk_cols * self.cell_size
+        chunk_height = self.chunk_rows * self.cell_size
+        max_cx = (self.width - 1) // self.chunk_cols
+        max_cy = (self.height - 1) // self.chunk_rows
+        if rect.width <= 0 or rect.height <= 0 or self.width == 0 or self.height == 0:
+            return []
+        first_cx = max(0, rect.left // chunk_width)
+        last_cx = min(max_cx, (rect.right - 1) // chunk_width)
+        first_cy = max(0, rect.top // chunk_height)
+        last_cy = min(max_cy, (rect.bottom - 1) // chunk_height)
+        return [(cx, cy) for cy in range(first_cy, last_cy + 1) for cx in range(first_cx, last_cx + 1)]
+
+    def prerender(self, rect):
+        for cx, cy in self.visible_chunks(rect):
+            self._chunk(cx, cy)
 
-        for y, row in enumerate(self.level_map):
-            for x, cell in enumerate(row):
-                if cell == '#':
-                    self.walls.append((x, y))
-                else:
-                    self.floors.append((x, y))
-                if cell == 'P':
-                    self.player_start = (x, y)
-                elif cell == 'F':
-                    self.firefly_end = (x, y)
-        if self.player_start and self.firefly_end:
-            x, y = self.player_start
-            path = []
-            visited = set()
-            start_found = False
-            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nx = x + dx
-                ny = y + dy
-                if 0 <= ny < len(self.level_map) and 0 <= nx < len(self.level_map[ny]):
-                    if self.level_map[ny][nx] in ['r', 'l', 'u', 'd']:
-                        x, y = nx, ny
-                        start_found = True
-                        break
-            if not start_found:
-                return
-            while True:
-                if (x, y) == self.firefly_end:
-                    path.append((x, y))
-                    break
-                if (x < 0 or y < 0 or y >= len(self.level_map) or x >= len(self.level_map[y])):
-                    break
-                cell = self.level_map[y][x]
-                if (x, y) in visited:
-                    break
-                visited.add((x, y))
-                path.append((x, y))
-                if cell == 'r':
-                    x += 1
-                elif cell == 'l':
-                    x -= 1
-                elif cell == 'u':
-                    y -= 1
-                elif cell == 'd':
-                    y += 1
-                elif cell == '_':
-                    if len(path) >= 2:
-                        prev_x, prev_y = path[-2]
-                        dx = x - prev_x
-                        dy = y - prev_y
-                        x += dx
-                        y += dy
-                    else:
-                        break
-                else:
-                    break
-            self.firefly_path = path
-
-    def draw(self, screen):
-        for x, y in self.floors:
-            screen.blit(self.floor_image, (x * self.cell_size, y * self.cell_size))
-        for x, y in self.walls:
-            screen.blit(self.wall_image, (x * self.cell_size, y * self.cell_size))
+    def draw(self, screen, camera=None):
+        ox, oy = camera.offset if camera else (0, 0)
+        visible = self.visible_chunks(screen.get_clip().move(ox, oy))
+        chunk_width = self.chunk_cols * self.cell_size
+        chunk_height = self.chunk_rows * self.cell_size
+        screen.blits([(self._chunk(cx, cy), (cx * chunk_width - ox, cy * chunk_height - oy))
+                      for cx, cy in visible], doreturn=False)
+        if self.chunk_bytes > self.chunk_budget:
+            self._evict_chunks(set(visible))
+        return len(visible)
 
     def get_walls(self):
-        return self.walls.copy()
\ No newline at end of file
+        return frozenset((index % self.width, index // self.width)
+                         for index, cell in enumerate(self.grid) if cell == self.WALL)
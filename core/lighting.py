@@ -0,0 +1,170 @@
+import os
+import tempfile
+
+import numpy
+import pygame
+
+from core.renderer import merge_rects
+
+FALLOFF_CURVES = {
+    'linear': lambda t: t,
+    'quadratic': lambda t: t * t,
+    'smooth': lambda t: t * t * (3 - 2 * t),
+}
+
+
+def light_mask_alpha(radius, alpha=220, curve='linear'):
+    if curve not in FALLOFF_CURVES:
+        raise ValueError(f"Unknown light falloff curve: {curve}")
+    size = radius * 2
+    offsets = numpy.arange(size) - size // 2
+    distance = numpy.hypot(offsets[:, None], offsets[None, :]) / radius
+    falloff = FALLOFF_CURVES[curve](numpy.clip(1.0 - distance, 0.0, 1.0))
+    return (alpha * falloff).astype(numpy.uint8)
+
+
+def mask_from_alpha(values):
+    mask = pygame.Surface(values.shape, pygame.SRCALPHA)
+    mask.fill((0, 0, 0, 0))
+    pixels = pygame.surfarray.pixels_alpha(mask)
+    pixels[...] = values
+    del pixels
+    return mask
+
+
+def create_light_mask(radius, alpha=220, curve='linear'):
+    return mask_from_alpha(light_mask_alpha(radius, alpha, curve))
+
+
+class MaskCache:
+    def __init__(self, directory=None, cell_size=0):
+        self.directory = directory
+        self.cell_size = cell_size
+        self.masks = {}
+
+    def _path(self, radius, alpha, curve):
+        return os.path.join(self.directory, f"mask-{radius}-{alpha}-{curve}-{self.cell_size}.npy")
+
+    def get(self, radius, alpha, curve='linear'):
+        key = (radius, alpha, curve)
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = mask_from_alpha(self._load(*key))
+            self.masks[key] = mask
+        return mask
+
+    def _load(self, radius, alpha, curve):
+        if not self.directory:
+            return light_mask_alpha(radius, alpha, curve)
+
+        path = self._path(radius, alpha, curve)
+        try:
+            values = numpy.load(path)
+            if values.shape == (radius * 2, radius * 2) and values.dtype == numpy.uint8:
+                return values
+        except (OSError, ValueError, EOFError):
+            pass
+
+        values = light_mask_alpha(radius, alpha, curve)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                numpy.save(f, values)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error caching light mask: {e}")
+        return values
+
+
+class Light:
+    def __init__(self, radius, intensity, position=(0, 0), curve='linear'):
+        self.radius = radius
+        self.intensity = intensity
+        self.curve = curve
+        self.position = position
+        self.drawn_rect = None
+        self.drawn_key = None
+        self.drawn_mask = None
+        self.occluded_mask = None
+
+    @property
+    def key(self):
+        return self.radius, self.intensity, self.curve
+
+    def rect(self, mask):
+        return mask.get_rect(center=(int(self.position[0]), int(self.position[1])))
+
+
+class LightingSystem:
+    def __init__(self, size, mask_cache=None, darkness_alpha=250):
+        self.darkness_color = (0, 0, 0, darkness_alpha)
+        self.buffer = pygame.Surface(size, pygame.SRCALPHA)
+        self.buffer.fill(self.darkness_color)
+        self.buffer_rect = self.buffer.get_rect()
+        self.lights = []
+        self.mask_cache = mask_cache or MaskCache()
+        self.occluder = None
+        self.offset = (0, 0)
+        self.pending = []
+        self.blits = 0
+
+    def mask(self, light):
+        return self.mask_cache.get(*light.key)
+
+    def set_view(self, occluder, offset):
+        self.occluder = occluder
+        self.offset = offset
+
+    def add_light(self, light):
+        self.lights.append(light)
+        light.drawn_rect = None
+        light.drawn_key = None
+        return light
+
+    def remove_light(self, light):
+        self.lights.remove(light)
+        if light.drawn_rect:
+            self.pending.append(light.drawn_rect)
+
+    def clear(self):
+        for light in list(self.lights):
+            self.remove_light(light)
+
+    def update(self):
+        regions = self.pending
+        self.pending = []
+        for light in self.lights:
+            mask = self.mask(light)
+            rect = light.rect(mask)
+            key = light.key
+            if self.occluder is not None:
+                key += (self.occluder, self.offset)
+            if rect != light.drawn_rect or key != light.drawn_key:
+                if light.drawn_rect:
+                    regions.append(light.drawn_rect)
+                regions.append(rect)
+                light.drawn_rect = rect
+                light.drawn_key = key
+                if self.occluder is not None:
+                    mask = light.occluded_mask = self.occluder.occlude(mask, rect, self.offset,
+                                                                       light.occluded_mask)
+                light.drawn_mask = mask
+
+        regions = [rect.clip(self.buffer_rect) for rect in merge_rects(regions)]
+        self.blits = 0
+        for region in regions:
+            if not region.width or not region.height:
+                continue
+            self.buffer.set_clip(region)
+            self.buffer.fill(self.darkness_color, region)
+            for light in self.lights:
+                if light.drawn_rect.colliderect(region):
+                    self.buffer.blit(light.drawn_mask, light.drawn_rect, special_flags=pygame.BLEND_RGBA_SUB)
+                    self.blits += 1
+        self.buffer.set_clip(None)
+        return regions
+
+    def draw(self, screen):
+        screen.blit(self.buffer, (0, 0))
+        return 1
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from core.level import Level
+from entities.player import Player
+from entities.firefly import Firefly
+
+
+def prepare_level(config, assets, level_num):
+    level = Level(config, assets, level_num)
+    view_width, view_height = config.screen_size
+    x, y = level.player_start
+    level.prerender(pygame.Rect(x * config.cell_size - view_width // 2, y * config.cell_size - view_height // 2,
+                                view_width, view_height))
+    player = Player(config, assets, *level.player_start)
+    firefly = Firefly(config, assets, level.firefly_route, level.width)
+    return level, player, firefly
+
+
+class LevelLoader:
+    def __init__(self, config, assets, total_levels):
+        self.config = config
+        self.assets = assets
+        self.total_levels = total_levels
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-loader")
+        self.pending = {}
+
+    def prefetch(self, level_num):
+        if level_num in self.pending or not 1 <= level_num <= self.total_levels:
+            return
+        self.pending[level_num] = self.executor.submit(prepare_level, self.config, self.assets, level_num)
+
+    def get(self, level_num):
+        future = self.pending.pop(level_num, None)
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"Error prefetching level {level_num}: {e}")
+        return prepare_level(self.config, self.assets, level_num)
+
+    def discard(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def shutdown(self):
+        self.pending.clear()
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,51 @@
+import pygame
+
+
+class MusicPlayer:
+    def __init__(self, config, fade_ms=800):
+        self.config = config
+        self.fade_ms = fade_ms
+        self.current = None
+        self.pending = None
+        self.fading = False
+
+    @property
+    def enabled(self):
+        return pygame.mixer.get_init() is not None
+
+    def play(self, track):
+        if not self.enabled:
+            return
+        if track == self.current and not self.fading:
+            self.pending = None
+            return
+        self.pending = track
+        if self.current is None:
+            self._start_pending()
+        elif not self.fading:
+            pygame.mixer.music.fadeout(self.fade_ms)
+            self.fading = True
+
+    def stop(self):
+        self.pending = None
+        if self.enabled and self.current is not None and not self.fading:
+            pygame.mixer.music.fadeout(self.fade_ms)
+            self.fading = True
+
+    def update(self):
+        if not self.fading or not self.enabled or pygame.mixer.music.get_busy():
+            return
+        self.fading = False
+        self.current = None
+        if self.pending is not None:
+            self._start_pending()
+
+    def _start_pending(self):
+        track, self.pending = self.pending, None
+        try:
+            pygame.mixer.music.load(self.config.get_sound_path(track))
+            pygame.mixer.music.play(-1, fade_ms=self.fade_ms)
+            self.current = track
+        except pygame.error as e:
+            print(f"Error loading music {track}: {e}")
+            self.current = None
@@ -0,0 +1,38 @@
+import pygame
+
+
+class FramePacer:
+    PRECISE = 'precise'
+    POWER = 'power'
+
+    def __init__(self, fps, idle_fps, mode=POWER):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.mode = mode
+        self.last_frame = pygame.time.get_ticks()
+
+    def _wait_events(self):
+        if self.idle_fps > 0:
+            remaining = int(1000 / self.idle_fps) - (pygame.time.get_ticks() - self.last_frame)
+            if remaining <= 0:
+                return pygame.event.get()
+            event = pygame.event.wait(remaining)
+        else:
+            event = pygame.event.wait()
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def next_frame(self, idle=False):
+        if idle:
+            events = self._wait_events()
+            ms = self.clock.tick()
+        else:
+            if self.mode == self.PRECISE:
+                ms = self.clock.tick_busy_loop(self.fps)
+            else:
+                ms = self.clock.tick(self.fps)
+            events = pygame.event.get()
+        self.last_frame = pygame.time.get_ticks()
+        return ms / 1000.0, events, idle
@@ -0,0 +1,95 @@
+from array import array
+from collections import deque
+
+from core.compiler import WALL
+
+NEIGHBOURS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
+class FireflyPath:
+    def __init__(self, xs, ys, step_time):
+        self.xs = xs
+        self.ys = ys
+        self.step_time = step_time
+
+    @classmethod
+    def from_indices(cls, indices, width, step_time):
+        return cls(array('I', (index % width for index in indices)),
+                   array('I', (index // width for index in indices)), step_time)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        return self.xs[index], self.ys[index]
+
+    @property
+    def duration(self):
+        return max(len(self.xs) - 1, 0) * self.step_time
+
+    def index_at(self, t):
+        if t <= 0 or not self.xs:
+            return 0
+        return min(int(t / self.step_time), len(self.xs) - 1)
+
+    def position_at(self, t):
+        index = self.index_at(t)
+        x, y = self.xs[index], self.ys[index]
+        if index + 1 >= len(self.xs):
+            return float(x), float(y)
+        fraction = min(max((t - index * self.step_time) / self.step_time, 0.0), 1.0)
+        return x + (self.xs[index + 1] - x) * fraction, y + (self.ys[index + 1] - y) * fraction
+
+
+def shortest_distance(grid, width, height, start, goal):
+    if start is None or goal is None:
+        return None
+    start_index = start[1] * width + start[0]
+    goal_index = goal[1] * width + goal[0]
+    distance = array('i', [-1]) * (width * height)
+    distance[start_index] = 0
+    queue = deque([start_index])
+    while queue:
+        index = queue.popleft()
+        if index == goal_index:
+            return distance[index]
+        x, y = index % width, index // width
+        for dx, dy in NEIGHBOURS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbour = ny * width + nx
+                if distance[neighbour] < 0 and grid[neighbour] != WALL:
+                    distance[neighbour] = distance[index] + 1
+                    queue.append(neighbour)
+    return None
+
+
+def validate_level(data):
+    problems = []
+    if data.player_start is None:
+        problems.append("no player start 'P'")
+    if data.firefly_end is None:
+        problems.append("no firefly end 'F'")
+    if problems:
+        return problems
+
+    end_index = data.firefly_end[1] * data.width + data.firefly_end[0]
+    if not data.path:
+        problems.append("no firefly route next to 'P'")
+    elif data.path[-1] != end_index:
+        x, y = data.path[-1] % data.width, data.path[-1] // data.width
+        problems.append(f"firefly route stops at {(x, y)} instead of reaching 'F' at {data.firefly_end}")
+
+    previous = data.player_start[1] * data.width + data.player_start[0]
+    for step, index in enumerate(data.path):
+        if data.grid[index] == WALL:
+            problems.append(f"firefly route step {step} is inside a wall")
+            break
+        if abs(index % data.width - previous % data.width) + abs(index // data.width - previous // data.width) != 1:
+            problems.append(f"firefly route step {step} is not adjacent to the previous cell")
+            break
+        previous = index
+
+    if shortest_distance(data.grid, data.width, data.height, data.player_start, data.firefly_end) is None:
+        problems.append("'F' is not reachable from 'P'")
+    return problems
@@ -0,0 +1,107 @@
+import csv
+import json
+import sys
+import time
+from collections import deque
+
+
+class Section:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        timings = self.profiler.timings
+        timings[self.name] = timings.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    def __init__(self, history=600):
+        self.frames = deque(maxlen=history)
+        self.sections = {}
+        self.section_names = []
+        self.timings = {}
+        self.counters = {}
+        self.trace = None
+        self.frame_index = 0
+        self.frame_start = None
+        self.previous_start = None
+        self.allocated_blocks = sys.getallocatedblocks()
+
+    def section(self, name):
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+            self.section_names.append(name)
+        return section
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def start_trace(self):
+        self.trace = []
+
+    def begin_frame(self):
+        self.previous_start = self.frame_start
+        self.frame_start = time.perf_counter()
+        self.timings = {}
+        self.counters = {}
+
+    def end_frame(self):
+        now = time.perf_counter()
+        allocated_blocks = sys.getallocatedblocks()
+        frame = {
+            'frame': self.frame_index,
+            'frame_ms': (self.frame_start - self.previous_start) * 1000 if self.previous_start else 0.0,
+            'work_ms': (now - self.frame_start) * 1000,
+            'alloc_blocks': allocated_blocks - self.allocated_blocks,
+        }
+        for name, seconds in self.timings.items():
+            frame[f'{name}_ms'] = seconds * 1000
+        frame.update(self.counters)
+        self.allocated_blocks = allocated_blocks
+        self.frame_index += 1
+        self.frames.append(frame)
+        if self.trace is not None:
+            self.trace.append(frame)
+
+    @staticmethod
+    def percentile(values, fraction):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self):
+        frame_times = [frame['frame_ms'] for frame in self.frames if frame['frame_ms']]
+        count = len(self.frames) or 1
+        stats = {
+            'fps': 1000 * len(frame_times) / sum(frame_times) if frame_times else 0.0,
+            'p50_ms': self.percentile(frame_times, 0.5),
+            'p99_ms': self.percentile(frame_times, 0.99),
+            'blits': sum(frame.get('blits', 0) for frame in self.frames) / count,
+            'alloc_blocks': sum(frame['alloc_blocks'] for frame in self.frames) / count,
+        }
+        for name in self.section_names:
+            stats[f'{name}_ms'] = sum(frame.get(f'{name}_ms', 0.0) for frame in self.frames) / count
+        return stats
+
+    def dump(self, path):
+        frames = self.trace if self.trace is not None else list(self.frames)
+        if path.endswith('.csv'):
+            fields = ['frame', 'frame_ms', 'work_ms', 'alloc_blocks']
+            fields += [f'{name}_ms' for name in self.section_names]
+            fields += sorted({key for frame in frames for key in frame} - set(fields))
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields, restval=0)
+                writer.writeheader()
+                writer.writerows(frames)
+        else:
+            with open(path, 'w') as f:
+                json.dump({'stats': self.stats(), 'frames': frames}, f, indent=1)
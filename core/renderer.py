@@ -0,0 +1,63 @@
+import pygame
+
+
+def merge_rects(rects):
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRenderer:
+    def __init__(self, screen, full_update_ratio=0.5):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.set_full_update_ratio(full_update_ratio)
+        self.full_redraw = True
+        self.tracked = []
+        self.previous_tracked = []
+        self.rects = []
+        self.frame_rects = []
+
+    def set_full_update_ratio(self, ratio):
+        self.full_update_area = int(self.screen_rect.width * self.screen_rect.height * ratio)
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def add(self, rect):
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def track(self, rect):
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect.width and rect.height:
+            self.tracked.append(rect)
+
+    def regions(self):
+        if not self.full_redraw:
+            self.frame_rects = merge_rects(self.rects + self.previous_tracked + self.tracked)
+            area = sum(rect.width * rect.height for rect in self.frame_rects)
+            if area > self.full_update_area:
+                self.full_redraw = True
+        if self.full_redraw:
+            self.frame_rects = [self.screen_rect.copy()]
+        return self.frame_rects
+
+    def present(self):
+        if self.full_redraw:
+            pygame.display.flip()
+        elif self.frame_rects:
+            pygame.display.update(self.frame_rects)
+        self.previous_tracked = self.tracked
+        self.tracked = []
+        self.rects = []
+        self.frame_rects = []
+        self.full_redraw = False
+
@@ -0,0 +1,128 @@
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+
+from core.input import STOP
+
+MAGIC = b'FFRP'
+VERSION = 1
+HEADER = struct.Struct('<4sHxxII')
+DIRECTIONS = (STOP, (0, -1), (0, 1), (-1, 0), (1, 0))
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+
+class InputLog:
+    def __init__(self, level, dts=None, codes=None):
+        self.level = level
+        self.dts = dts if dts is not None else array('d')
+        self.codes = codes if codes is not None else bytearray()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def append(self, dt, direction):
+        self.dts.append(dt)
+        self.codes.append(DIRECTION_CODES[direction])
+
+    def direction(self, tick):
+        return DIRECTIONS[self.codes[tick]]
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.level, len(self)))
+            f.write(self._dts_bytes())
+            f.write(bytes(self.codes))
+
+    def _dts_bytes(self):
+        dts = array('d', self.dts)
+        if sys.byteorder == 'big':
+            dts.byteswap()
+        return dts.tobytes()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, level, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported input log format")
+        dts_end = HEADER.size + count * 8
+        if len(data) < dts_end + count:
+            raise ValueError("Truncated input log")
+        dts = array('d', data[HEADER.size:dts_end])
+        if sys.byteorder == 'big':
+            dts.byteswap()
+        return cls(level, dts, bytearray(data[dts_end:dts_end + count]))
+
+
+class Recorder:
+    IDLE = 0
+    RECORDING = 1
+    FINISHED = 2
+
+    def __init__(self):
+        self.log = None
+        self.status = self.IDLE
+
+    def start(self, level):
+        if self.status == self.IDLE:
+            self.log = InputLog(level)
+            self.status = self.RECORDING
+
+    def stop(self):
+        if self.status == self.RECORDING:
+            self.status = self.FINISHED
+
+    def record(self, dt, direction):
+        if self.status == self.RECORDING:
+            self.log.append(dt, direction)
+
+
+class Replayer:
+    def __init__(self, game, log, snapshot_interval=600):
+        self.game = game
+        self.log = log
+        self.snapshot_interval = snapshot_interval
+        self.tick = 0
+        self.snapshot_ticks = []
+        self.snapshots = []
+        game.input = self
+
+    @property
+    def finished(self):
+        return self.tick >= len(self.log)
+
+    def direction(self):
+        if self.finished:
+            return STOP
+        return self.log.direction(self.tick)
+
+    def start(self):
+        self.game.start_level(self.log.level)
+        self.tick = 0
+        self.snapshot_ticks = [0]
+        self.snapshots = [self.game.snapshot()]
+
+    def step(self):
+        if self.finished:
+            return False
+        self.game.update(self.log.dts[self.tick])
+        self.tick += 1
+        if self.tick % self.snapshot_interval == 0 and self.tick > self.snapshot_ticks[-1]:
+            self.snapshot_ticks.append(self.tick)
+            self.snapshots.append(self.game.snapshot())
+        return True
+
+    def fast_forward(self, ticks=None):
+        end = len(self.log) if ticks is None else min(len(self.log), self.tick + ticks)
+        while self.tick < end:
+            self.step()
+
+    def seek(self, tick):
+        tick = max(0, min(tick, len(self.log)))
+        if tick < self.tick:
+            index = bisect_right(self.snapshot_ticks, tick) - 1
+            self.game.restore(self.snapshots[index])
+            self.tick = self.snapshot_ticks[index]
+        self.fast_forward(tick - self.tick)
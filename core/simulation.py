@@ -0,0 +1,78 @@
+import os
+import time
+from collections import namedtuple
+
+import pygame
+
+from core.game import Game
+from core.input import STOP
+
+SimulationResult = namedtuple('SimulationResult', 'level completed ticks sim_time wall_time')
+
+
+def init_headless():
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.init()
+
+
+class AutopilotInput:
+    def __init__(self, game):
+        self.game = game
+        self.path = None
+        self.steps = {}
+
+    def direction(self):
+        path = self.game.firefly.route
+        if not path:
+            return STOP
+        if path is not self.path:
+            self.path = path
+            self.steps = {cell: index for index, cell in enumerate(path)}
+
+        position = (self.game.player.grid_x, self.game.player.grid_y)
+        index = self.steps.get(position, -1) + 1
+        if index >= len(path):
+            return STOP
+        target_x, target_y = path[index]
+        if target_x != position[0]:
+            return (1 if target_x > position[0] else -1), 0
+        if target_y != position[1]:
+            return 0, (1 if target_y > position[1] else -1)
+        return STOP
+
+
+class Simulation:
+    def __init__(self, config, dt=None, input_source=None, assets=None):
+        self.game = Game(config, assets, input_source)
+        if input_source is None:
+            self.game.input = AutopilotInput(self.game)
+        self.dt = dt or self.game.tick_time
+        self.ticks = 0
+
+    def start_level(self, level_num):
+        self.game.start_level(level_num)
+
+    def step(self, ticks=1):
+        for _ in range(ticks):
+            self.game.update(self.dt)
+            self.ticks += 1
+
+    def level_running(self, level_num):
+        return self.game.current_state == Game.GAME and self.game.current_level == level_num
+
+    def play_level(self, level_num, max_ticks=100000):
+        self.start_level(level_num)
+        started = time.perf_counter()
+        ticks = 0
+        while ticks < max_ticks and self.level_running(level_num):
+            self.game.update(self.dt)
+            ticks += 1
+        self.ticks += ticks
+        return SimulationResult(level_num, not self.level_running(level_num), ticks,
+                                ticks * self.dt, time.perf_counter() - started)
+
+    def close(self):
+        self.game.loader.shutdown()
+        self.game.backgrounds.shutdown()
+        pygame.quit()
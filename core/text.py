@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    def __init__(self, capacity=256, layout_capacity=64):
+        self.capacity = capacity
+        self.layout_capacity = layout_capacity
+        self.surfaces = OrderedDict()
+        self.layouts = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def wrap(self, font, text, width):
+        key = (font, text, width)
+        lines = self.layouts.get(key)
+        if lines is not None:
+            self.layouts.move_to_end(key)
+            return lines
+
+        lines = []
+        line = ""
+        for word in text.split():
+            test_line = line + word + " "
+            if font.size(test_line)[0] > width:
+                lines.append(line)
+                line = word + " "
+            else:
+                line = test_line
+        if line:
+            lines.append(line)
+
+        lines = tuple(lines)
+        self.layouts[key] = lines
+        if len(self.layouts) > self.layout_capacity:
+            self.layouts.popitem(last=False)
+        return lines
+
+    def clear(self):
+        self.surfaces.clear()
+        self.layouts.clear()
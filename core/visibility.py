@@ -0,0 +1,107 @@
+from collections import OrderedDict
+
+import numpy
+import pygame
+
+from core.compiler import WALL
+
+OCTANTS = ((1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+           (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1))
+
+
+def shadowcast(grid, width, height, cx, cy, radius):
+    size = radius * 2 + 1
+    visible = numpy.zeros((size, size), dtype=bool)
+    visible[radius, radius] = True
+
+    def blocked(x, y):
+        return not (0 <= x < width and 0 <= y < height) or grid[y * width + x] == WALL
+
+    for xx, xy, yx, yy in OCTANTS:
+        stack = [(1, 1.0, 0.0)]
+        while stack:
+            row, start, end = stack.pop()
+            if start < end:
+                continue
+            new_start = start
+            for distance in range(row, radius + 1):
+                dx, dy = -distance - 1, -distance
+                blocked_run = False
+                while dx <= 0:
+                    dx += 1
+                    left_slope = (dx - 0.5) / (dy + 0.5)
+                    right_slope = (dx + 0.5) / (dy - 0.5)
+                    if start < right_slope:
+                        continue
+                    if end > left_slope:
+                        break
+                    x = cx + dx * xx + dy * xy
+                    y = cy + dx * yx + dy * yy
+                    visible[y - cy + radius, x - cx + radius] = True
+                    wall = blocked(x, y)
+                    if blocked_run:
+                        if wall:
+                            new_start = right_slope
+                        else:
+                            blocked_run = False
+                            start = new_start
+                    elif wall and distance < radius:
+                        blocked_run = True
+                        stack.append((distance + 1, start, left_slope))
+                        new_start = right_slope
+                if blocked_run:
+                    break
+    return visible
+
+
+class VisibilityMap:
+    def __init__(self, grid, width, height, cell_size, capacity=64):
+        self.grid = grid
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.capacity = capacity
+        self.cells = {}
+        self.surfaces = OrderedDict()
+
+    def visible(self, cx, cy, radius):
+        key = (cy * self.width + cx, radius)
+        visible = self.cells.get(key)
+        if visible is None:
+            visible = self.cells[key] = shadowcast(self.grid, self.width, self.height, cx, cy, radius)
+        return visible
+
+    def surface(self, cx, cy, radius):
+        key = (cy * self.width + cx, radius)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        visible = self.visible(cx, cy, radius)
+        cells = pygame.Surface(visible.shape, pygame.SRCALPHA)
+        cells.fill((255, 255, 255, 0))
+        pixels = pygame.surfarray.pixels_alpha(cells)
+        pixels[...] = visible.T * 255
+        del pixels
+        surface = pygame.transform.scale(cells, (visible.shape[1] * self.cell_size,
+                                                 visible.shape[0] * self.cell_size))
+
+        self.surfaces[key] = surface
+        while len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def occlude(self, mask, rect, offset, target=None):
+        cell_size = self.cell_size
+        cx = (rect.centerx + offset[0]) // cell_size
+        cy = (rect.centery + offset[1]) // cell_size
+        radius = -(-max(rect.width, rect.height) // (2 * cell_size))
+        if target is None or target.get_size() != mask.get_size():
+            target = pygame.Surface(mask.get_size(), pygame.SRCALPHA)
+        target.fill((0, 0, 0, 0))
+        target.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        target.blit(self.surface(cx, cy, radius),
+                    ((cx - radius) * cell_size - offset[0] - rect.x, (cy - radius) * cell_size - offset[1] - rect.y),
+                    special_flags=pygame.BLEND_RGBA_MULT)
+        return target
@@ -1,58 +1,62 @@
-import pygame
+from core.path import FireflyPath
+
 
 class Firefly:
-    def __init__(self, config, path):
+    def __init__(self, config, assets, path, width):
         self.config = config
-        self.path = path or []
         self.cell_size = config.cell_size
-        self.images = [
-            pygame.image.load(config.get_image_path(f"firefly_{i}.png")).convert_alpha()
-            for i in range(4)
-        ]
+        self.assets = assets
+        self.images = assets.atlas([f"firefly_{i}.png" for i in range(4)])
         self.animation_delay = config.firefly_animation_delay
         self.move_delay = config.firefly_move_delay
+        self.route = FireflyPath.from_indices(path, width, self.move_delay)
         self.animation_timer = 0.0
-        self.move_timer = 0.0
+        self.elapsed = 0.0
         self.frame = 0
         self.index = 0
         self.waiting_for_player = False
-        self.last_pos = None
-        self.floor_image = pygame.image.load(config.get_image_path("floor.png")).convert_alpha()
 
     def update(self, dt, wait_for_player=None):
-        self.last_pos = self.pos
-
         self.animation_timer += dt
         if self.animation_timer >= self.animation_delay:
             self.animation_timer -= self.animation_delay
             self.frame = (self.frame + 1) % 4
 
-        if not self.path:
+        if not self.route:
             return
 
-        if self.index >= len(self.path) - 1:
+        if self.index >= len(self.route) - 1:
             self.waiting_for_player = True
-            return
 
-        self.move_timer += dt
-        if self.move_timer >= self.move_delay:
-            self.move_timer -= self.move_delay
-            if self.index < len(self.path) - 1:
-                self.index += 1
+        self.elapsed = min(self.elapsed + dt, self.route.duration + self.move_delay)
+        self.index = self.route.index_at(self.elapsed)
+
+    def snapshot(self):
+        return self.index, self.animation_timer, self.elapsed, self.frame, self.waiting_for_player
+
+    def restore(self, state):
+        self.index, self.animation_timer, self.elapsed, self.frame, self.waiting_for_player = state
 
-    @property
-    def pos(self):
-        if not self.path:
+    def render_pos(self, lag=0.0):
+        if not self.route:
             return (0, 0)
-        x, y = self.path[self.index]
-        return x * self.cell_size, y * self.cell_size
-
-    def draw(self, screen):
-        if self.last_pos:
-            lx, ly = self.last_pos
-            screen.blit(self.floor_image, (lx, ly))
-        if self.path and self.index < len(self.path):
-            img = self.images[self.frame]
-            x, y = self.pos
+        x, y = self.route.position_at(max(self.elapsed + lag - self.move_delay, 0.0))
+        return round(x * self.cell_size), round(y * self.cell_size)
+
+    def render_rect(self, lag=0.0):
+        x, y = self.render_pos(lag)
+        return self.images[self.frame].get_rect(center=(x + self.cell_size // 2, y + self.cell_size // 2))
+
+    def sprite(self, size=None):
+        return self.assets.transformed(self.images[self.frame], size)
+
+    def draw(self, screen, offset=(0, 0), lag=0.0):
+        if self.route and self.index < len(self.route):
+            img = self.sprite()
+            x, y = self.render_pos(lag)
+            x -= offset[0]
+            y -= offset[1]
             rect = img.get_rect(center=(x + self.cell_size // 2, y + self.cell_size // 2))
             screen.blit(img, rect)
+            return 1
+        return 0
@@ -1,64 +1,80 @@
 import pygame
 
 class Player:
-    def __init__(self, config, grid_x, grid_y):
+    def __init__(self, config, assets, grid_x, grid_y):
         self.config = config
         self.grid_x = grid_x
         self.grid_y = grid_y
+        self.from_x = grid_x
+        self.from_y = grid_y
         self.cell_size = config.cell_size
-        self.images = [
-            pygame.image.load(config.get_image_path(f"player_{i}.png")).convert_alpha()
-            for i in range(2)
-        ]
+        self.assets = assets
+        self.images = assets.atlas([f"player_{i}.png" for i in range(2)])
         self.animation_delay = 0.18
         self.animation_timer = 0.0
         self.frame = 0
         self.move_timer = 0.0
         self.last_direction = (1, 0)
-        self.last_position = (grid_x, grid_y)
-        self.floor_image = pygame.image.load(config.get_image_path("floor.png")).convert_alpha()
 
-    def update(self, dt, walls):
+    def update(self, dt, level, direction):
         self.move_timer += dt
         self.animation_timer += dt
-        self.last_position = (self.grid_x, self.grid_y)
 
         if self.animation_timer >= self.animation_delay:
             self.animation_timer -= self.animation_delay
             self.frame = (self.frame + 1) % 2
 
         if self.move_timer >= self.config.move_cooldown:
-            keys = pygame.key.get_pressed()
-            dx, dy = 0, 0
-            if keys[pygame.K_w]:
-                dy = -1
-            elif keys[pygame.K_s]:
-                dy = 1
-            elif keys[pygame.K_a]:
-                dx = -1
-            elif keys[pygame.K_d]:
-                dx = 1
-
+            dx, dy = direction
             if dx != 0 or dy != 0:
-                if self.move(dx, dy, walls):
+                if self.move(dx, dy, level):
                     self.last_direction = (dx, dy)
                     self.move_timer = 0.0
 
-    def move(self, dx, dy, walls):
+    def snapshot(self):
+        return (self.grid_x, self.grid_y, self.from_x, self.from_y, self.animation_timer, self.frame,
+                self.move_timer, self.last_direction)
+
+    def restore(self, state):
+        (self.grid_x, self.grid_y, self.from_x, self.from_y, self.animation_timer, self.frame,
+         self.move_timer, self.last_direction) = state
+
+    def move(self, dx, dy, level):
         new_x = self.grid_x + dx
         new_y = self.grid_y + dy
-        if (new_x, new_y) not in walls:
+        if not level.is_blocked(new_x, new_y):
+            self.from_x = self.grid_x
+            self.from_y = self.grid_y
             self.grid_x = new_x
             self.grid_y = new_y
             return True
         return False
 
-    def draw(self, screen):
-        img = self.images[self.frame]
-        if self.last_direction[0] < 0:
-            img = pygame.transform.flip(img, True, False)
-        lx, ly = self.last_position
-        screen.blit(self.floor_image, (lx * self.cell_size, ly * self.cell_size))
-        x = self.grid_x * self.cell_size
-        y = self.grid_y * self.cell_size
-        screen.blit(img, (x, y))
+    @property
+    def rect(self):
+        return pygame.Rect(self.grid_x * self.cell_size, self.grid_y * self.cell_size,
+                           self.cell_size, self.cell_size)
+
+    @property
+    def gliding(self):
+        return ((self.from_x, self.from_y) != (self.grid_x, self.grid_y)
+                and self.move_timer < self.config.move_cooldown)
+
+    def render_pos(self, lag=0.0):
+        cooldown = self.config.move_cooldown
+        progress = min((self.move_timer + lag) / cooldown, 1.0) if cooldown > 0 else 1.0
+        x = self.from_x + (self.grid_x - self.from_x) * progress
+        y = self.from_y + (self.grid_y - self.from_y) * progress
+        return round(x * self.cell_size), round(y * self.cell_size)
+
+    def render_rect(self, lag=0.0):
+        return pygame.Rect(self.render_pos(lag), (self.cell_size, self.cell_size))
+
+    def sprite(self, size=None):
+        return self.assets.transformed(self.images[self.frame], size, self.last_direction[0] < 0)
+
+    def draw(self, screen, offset=(0, 0), lag=0.0):
+        img = self.sprite()
+        x, y = self.render_pos(lag)
+        screen.blit(img, (x - offset[0], y - offset[1]))
+        return 1
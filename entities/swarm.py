@@ -0,0 +1,88 @@
+import numpy
+import pygame
+
+from core.compiler import FLOOR, WALL
+
+
+class Swarm:
+    FRAMES = 4
+
+    def __init__(self, config, assets, level, count, seed=None):
+        self.cell_size = config.cell_size
+        self.animation_delay = config.firefly_animation_delay
+        self.speed = config.swarm_speed * self.cell_size
+        self.turn_rate = 3.0
+        self.rng = numpy.random.default_rng(seed)
+        size = max(self.cell_size // 2, 1)
+        self.size = size
+        self.images = [assets.transformed(image, (size, size))
+                       for image in assets.atlas([f"firefly_{i}.png" for i in range(self.FRAMES)])]
+
+        self.width, self.height = level.width, level.height
+        self.grid = numpy.frombuffer(level.grid, dtype=numpy.uint8).reshape(self.height, self.width)
+        floor = numpy.flatnonzero(self.grid.ravel() == FLOOR)
+        if not len(floor):
+            count = 0
+        self.count = count
+        cells = self.rng.choice(floor, count) if count else numpy.empty(0, dtype=numpy.intp)
+        self.x = ((cells % self.width) + self.rng.random(count)) * self.cell_size
+        self.y = ((cells // self.width) + self.rng.random(count)) * self.cell_size
+        self.angle = self.rng.uniform(0.0, 2 * numpy.pi, count)
+        self.timer = self.rng.uniform(0.0, self.animation_delay, count)
+        self.frame = self.rng.integers(0, self.FRAMES, count)
+
+    def snapshot(self):
+        return (self.x.copy(), self.y.copy(), self.angle.copy(), self.timer.copy(), self.frame.copy(),
+                self.rng.bit_generator.state)
+
+    def restore(self, state):
+        x, y, angle, timer, frame, self.rng.bit_generator.state = state
+        self.x, self.y, self.angle, self.timer, self.frame = x.copy(), y.copy(), angle.copy(), timer.copy(), frame.copy()
+
+    def update(self, dt):
+        if not self.count:
+            return
+        self.angle += self.rng.uniform(-self.turn_rate, self.turn_rate, self.count) * dt
+        x = self.x + numpy.cos(self.angle) * (self.speed * dt)
+        y = self.y + numpy.sin(self.angle) * (self.speed * dt)
+
+        cx = numpy.floor(x / self.cell_size).astype(numpy.intp)
+        cy = numpy.floor(y / self.cell_size).astype(numpy.intp)
+        inside = (cx >= 0) & (cx < self.width) & (cy >= 0) & (cy < self.height)
+        blocked = ~inside
+        blocked[inside] = self.grid[cy[inside], cx[inside]] == WALL
+
+        moving = ~blocked
+        self.x[moving] = x[moving]
+        self.y[moving] = y[moving]
+        self.angle[blocked] += numpy.pi
+
+        self.timer += dt
+        steps = (self.timer // self.animation_delay).astype(numpy.intp)
+        self.timer -= steps * self.animation_delay
+        self.frame = (self.frame + steps) % self.FRAMES
+
+    def screen_positions(self, offset):
+        half = self.size // 2
+        return ((self.x - (offset[0] + half)).astype(numpy.intp),
+                (self.y - (offset[1] + half)).astype(numpy.intp))
+
+    def bounds(self, offset=(0, 0)):
+        if not self.count:
+            return pygame.Rect(0, 0, 0, 0)
+        x, y = self.screen_positions(offset)
+        left, top = int(x.min()), int(y.min())
+        return pygame.Rect(left, top, int(x.max()) - left + self.size, int(y.max()) - top + self.size)
+
+    def draw(self, screen, offset=(0, 0)):
+        if not self.count:
+            return 0
+        clip = screen.get_clip()
+        x, y = self.screen_positions(offset)
+        visible = ((x > clip.left - self.size) & (x < clip.right)
+                   & (y > clip.top - self.size) & (y < clip.bottom))
+        images = self.images
+        blits = [(images[frame], (px, py)) for frame, px, py in
+                 zip(self.frame[visible].tolist(), x[visible].tolist(), y[visible].tolist())]
+        screen.blits(blits, doreturn=False)
+        return len(blits)
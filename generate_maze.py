@@ -0,0 +1,31 @@
+import argparse
+import sys
+import time
+
+from core.generator import generate_rows, write_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a random Firefly maze level.")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("--seed", type=int, help="seed for a reproducible maze")
+    parser.add_argument("--output", metavar="FILE", help="write the level to FILE instead of printing it")
+    args = parser.parse_args()
+
+    try:
+        if args.output:
+            start = time.perf_counter()
+            write_level(args.output, args.width, args.height, args.seed)
+            print(f"Wrote {args.width}x{args.height} maze to {args.output} "
+                  f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        else:
+            print('\n'.join(generate_rows(args.width, args.height, args.seed)))
+    except (OSError, ValueError) as e:
+        print(f"Error generating maze: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,40 @@
+import argparse
+
 import pygame
-from config import ConfigManager
+from config import ConfigManager, ConfigWatcher
+from core.assets import AssetManager
 from core.game import Game
+from core.replay import Recorder
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Firefly")
+    parser.add_argument("--record", metavar="FILE", help="record the play session's inputs to FILE")
+    parser.add_argument("--trace", metavar="FILE", help="write a per-frame timing trace to FILE (.csv or .json)")
+    parser.add_argument("--watch-config", action="store_true", help="apply changes to config.ini while running")
+    args = parser.parse_args()
+
     pygame.init()
     config = ConfigManager('config.ini')
+    assets = AssetManager(config)
 
-    icon_path = config.get_image_path("firefly_0.png")
-    icon = pygame.image.load(icon_path)
+    icon = assets.image("firefly_0.png", AssetManager.RAW)
     pygame.display.set_icon(icon)
 
-    game = Game(config)
+    game = Game(config, assets)
+    if args.record:
+        game.recorder = Recorder()
+    if args.trace:
+        game.profiler.start_trace()
+    if args.watch_config:
+        game.config_watcher = ConfigWatcher(config)
     game.run()
 
+    if args.record and game.recorder.log is not None:
+        game.recorder.log.save(args.record)
+    if args.trace:
+        game.profiler.dump(args.trace)
+
 
 if __name__ == "__main__":
     main()
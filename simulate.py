@@ -0,0 +1,65 @@
+import argparse
+import sys
+import time
+
+from config import ConfigManager
+from core.input import ScriptedInput
+from core.replay import InputLog, Replayer
+from core.simulation import Simulation, init_headless
+
+
+def replay(simulation, log, seek=None):
+    replayer = Replayer(simulation.game, log)
+    replayer.start()
+    started = time.perf_counter()
+    replayer.seek(len(log) if seek is None else seek)
+    elapsed = time.perf_counter() - started
+    game = simulation.game
+    print(f"replayed {replayer.tick}/{len(log)} ticks in {elapsed * 1000:.1f} ms: "
+          f"level {game.current_level}, player at {(game.player.grid_x, game.player.grid_y)}, "
+          f"firefly step {game.firefly.index}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Firefly levels headlessly with a fixed timestep.")
+    parser.add_argument("--config", default="config.ini")
+    parser.add_argument("--levels", type=int, nargs="+", help="levels to run (default: all)")
+    parser.add_argument("--dt", type=float, help="simulation timestep in seconds (default: 1 / tick_rate)")
+    parser.add_argument("--max-ticks", type=int, default=100000, help="give up on a level after this many ticks")
+    parser.add_argument("--script", help="file with one w/a/s/d/. input per tick (default: follow the firefly)")
+    parser.add_argument("--replay", metavar="FILE", help="replay an input log recorded with main.py --record")
+    parser.add_argument("--seek", type=int, help="stop the replay at this tick")
+    args = parser.parse_args()
+
+    init_headless()
+    config = ConfigManager(args.config)
+    script = None
+    if args.script:
+        try:
+            with open(args.script) as f:
+                script = ScriptedInput.from_string(f.read()).directions
+        except (OSError, ValueError) as e:
+            print(f"Error reading script: {e}")
+            return 1
+
+    simulation = Simulation(config, args.dt)
+    if args.replay:
+        replay(simulation, InputLog.load(args.replay), args.seek)
+        simulation.close()
+        return 0
+
+    failures = 0
+    for level_num in args.levels or range(1, config.total_levels + 1):
+        if script is not None:
+            simulation.game.input = ScriptedInput(script)
+        result = simulation.play_level(level_num, args.max_ticks)
+        status = "completed" if result.completed else "NOT completed"
+        print(f"level {level_num}: {status} after {result.ticks} ticks "
+              f"({result.sim_time:.2f}s simulated, {result.wall_time * 1000:.1f} ms)")
+        failures += not result.completed
+    simulation.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import argparse
+import glob
+import os
+import sys
+
+from config import ConfigManager
+from core.compiler import compile_file
+from core.path import shortest_distance, validate_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that Firefly levels have a complete, reachable firefly route.")
+    parser.add_argument("files", nargs="*", help="level files to check (default: every level in the levels folder)")
+    parser.add_argument("--config", default="config.ini")
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config)
+    files = args.files or sorted(glob.glob(os.path.join(os.path.dirname(config.get_level_path(1)), "*.txt")))
+    failures = 0
+    for path in files:
+        data = compile_file(path)
+        problems = validate_level(data)
+        if problems:
+            failures += 1
+            print(f"{path}: FAILED")
+            for problem in problems:
+                print(f"  - {problem}")
+        else:
+            shortest = shortest_distance(data.grid, data.width, data.height, data.player_start, data.firefly_end)
+            print(f"{path}: ok ({data.width}x{data.height}, route {len(data.path)} steps, shortest {shortest})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())